@@ -0,0 +1,62 @@
+"""
+Per-tick cost of alert evaluation with many active rules.
+
+Registers `rules` random ABOVE/BELOW thresholds spread over `symbols`
+symbols, then replays a random walk and reports the mean time per tick.
+Fired rules are replaced so the active count stays constant.
+
+Usage
+    PYTHONPATH=src python benchmarks/bench_alerts.py [rules] [symbols] [ticks]
+"""
+
+import random
+import sys
+import time
+
+from data_svc.alerts import AlertDirection, AlertEngine
+
+
+def main() -> None:
+    n_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    n_ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    rng = random.Random(7)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    prices = {s: 100.0 for s in symbols}
+
+    engine = AlertEngine(max_rules=n_rules)
+    for s in symbols:
+        engine.observe(s, prices[s])
+
+    def add_random_rule(symbol: str) -> None:
+        direction = rng.choice((AlertDirection.ABOVE, AlertDirection.BELOW))
+        sign = 1 if direction is AlertDirection.ABOVE else -1
+        engine.add_rule(symbol, direction, prices[symbol] * (1 + sign * rng.uniform(0.001, 0.2)))
+
+    for i in range(n_rules):
+        add_random_rule(symbols[i % n_symbols])
+
+    walk = []
+    for _ in range(n_ticks):
+        s = rng.choice(symbols)
+        prices[s] = round(prices[s] * (1 + rng.uniform(-0.01, 0.01)), 2)
+        walk.append((s, prices[s]))
+
+    fired = 0
+    elapsed = 0.0
+    for s, p in walk:
+        start = time.perf_counter()
+        triggers = engine.on_tick(s, p)
+        elapsed += time.perf_counter() - start
+        fired += len(triggers)
+        for t in triggers:
+            add_random_rule(t.rule.symbol)
+
+    print(
+        f"{len(engine):,} active rules, {n_symbols} symbols: "
+        f"{elapsed / n_ticks * 1e6:.2f} us/tick, {fired:,} fired over {n_ticks:,} ticks"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Frames/sec per core: regular Strawberry subscription path vs fast path.
+
+Both paths pull the same encoded Kafka records from the same async replay
+consumer and hand each `next` frame's text to the same awaited no-op
+sender, so the numbers exclude only the socket write itself. The fast loop
+mirrors `FastPathGraphQLTransportWSHandler.run_fast_operation`. Runs on a
+single event loop (one core).
+
+Usage
+    PYTHONPATH=src python benchmarks/bench_fastpath.py [frames]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from data_svc import server
+from data_svc.fastpath import compile_prices_plan
+from data_svc.kafka_utils import encode_price
+from data_svc.tracing import TraceContext
+
+
+FULL = "subscription { prices { symbol price changePercent timestamp } }"
+PARTIAL = "subscription { prices { symbol price } }"
+
+
+class ReplayConsumer:
+    def __init__(self, values):
+        self._values = iter(values)
+
+    async def getone(self):
+        try:
+            return SimpleNamespace(value=next(self._values), headers=None)
+        except StopIteration:
+            raise asyncio.CancelledError
+
+    async def stop(self):
+        pass
+
+
+def _records(n: int) -> list[bytes]:
+    symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
+    return [
+        encode_price(server.Price(
+            symbol=symbols[i % len(symbols)],
+            price=100.0 + (i % 500) / 100,
+            change_percent=0.12,
+            timestamp="2025-01-01T00:00:00.000000Z",
+        ))
+        for i in range(n)
+    ]
+
+
+async def _send(frame: str) -> None:
+    pass
+
+
+async def _regular(query: str, values: list[bytes]) -> float:
+    async def consumer(topic, group_id=None):
+        return ReplayConsumer(values)
+
+    server.create_started_consumer = consumer
+    start = time.perf_counter()
+    results = await server.schema.subscribe(query)
+    try:
+        async for result in results:
+            await _send(json.dumps({"id": "1", "type": "next", "payload": {"data": result.data}}))
+    except asyncio.CancelledError:
+        pass
+    return time.perf_counter() - start
+
+
+async def _fast(query: str, values: list[bytes]) -> float:
+    plan = compile_prices_plan(server.schema, query, None, None)
+    head, tail = plan.frame_affixes("1")
+    consumer = ReplayConsumer(values)
+    start = time.perf_counter()
+    try:
+        while True:
+            message = await consumer.getone()
+            TraceContext.from_headers(message.headers)
+            body = plan.render(message.value)
+            if body is None:
+                continue
+            await _send(head + body + tail)
+    except asyncio.CancelledError:
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    values = _records(n)
+    for label, query in (("full selection (raw)", FULL), ("partial selection (decoded)", PARTIAL)):
+        regular = asyncio.run(_regular(query, values))
+        fast = asyncio.run(_fast(query, values))
+        print(
+            f"{label:30s} regular {n / regular:>10,.0f} frames/s   "
+            f"fast {n / fast:>10,.0f} frames/s   x{regular / fast:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Order book simulator and delta pipeline cost at thousands of symbols.
+
+Steps a 10-level book per symbol along the publisher's random walk (+/-1%
+per tick), encodes every delta, and reports steps/sec plus the retained size
+of the ladders. The deltas are then conflated per symbol through
+merge_deltas, as the outbox does while the broker is stalled, and the merged
+result is checked against the simulated books.
+
+Usage
+    PYTHONPATH=src python benchmarks/bench_orderbook.py [symbols] [steps] [levels]
+"""
+
+import random
+import sys
+import time
+
+from data_svc.kafka_utils import encode_book_delta
+from data_svc.orderbook import LocalBook, OrderBookSimulator, merge_deltas
+
+
+def main() -> None:
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    levels = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    rng = random.Random(11)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+
+    sim = OrderBookSimulator(levels=levels)
+    prices = {s: round(rng.uniform(100, 400), 2) for s in symbols}
+    for s in symbols:
+        sim.on_tick(s, prices[s])
+    local = {s: LocalBook.from_simulated(sim.get(s)) for s in symbols}
+
+    walk = []
+    for _ in range(n_steps):
+        s = symbols[rng.randrange(n_symbols)]
+        prices[s] = max(1.0, prices[s] * (1 + rng.uniform(-0.01, 0.01)))
+        walk.append((s, prices[s]))
+
+    on_tick = sim.on_tick
+    deltas = []
+    payload = 0
+    start = time.perf_counter()
+    for s, p in walk:
+        delta = on_tick(s, p)
+        payload += len(encode_book_delta(delta))
+        deltas.append(delta)
+    elapsed = time.perf_counter() - start
+
+    pending = {}
+    start = time.perf_counter()
+    for delta in deltas:
+        prior = pending.get(delta.symbol)
+        pending[delta.symbol] = delta if prior is None else merge_deltas(prior, delta)
+    merge_elapsed = time.perf_counter() - start
+
+    for s, delta in pending.items():
+        local[s].apply(delta)
+    mismatched = sum(1 for s in symbols if local[s].top(levels) != sim.get(s).snapshot())
+
+    book = sim.get(symbols[0])
+    ladder_bytes = sum(a.buffer_info()[1] * a.itemsize for a in (book.bid_px, book.bid_sz, book.ask_px, book.ask_sz))
+    print(
+        f"{n_symbols:,} symbols x {levels} levels: {n_steps / elapsed:,.0f} steps/s "
+        f"({elapsed / n_steps * 1e6:.2f} us/step incl. encode), "
+        f"{payload / n_steps:.0f} B/delta, {ladder_bytes} B ladders/symbol; "
+        f"merge {merge_elapsed / n_steps * 1e6:.2f} us/delta, {mismatched} merged books mismatched"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Server-side price alert rules for data-svc.
+
+Clients register threshold rules instead of watching every tick. Each rule
+fires once, the first time a tick crosses its threshold in its direction, and
+is then removed.
+
+Indexing
+- Per symbol, ABOVE and BELOW thresholds are kept in sorted lists of
+  (threshold, rule_id) tuples.
+- A tick moving prev -> new only inspects the slice of thresholds between
+  the two prices, located with two bisects: O(log n + fired) per tick,
+  independent of how many rules are active.
+- A rule only fires on a crossing; one created while the price is already
+  beyond its threshold waits for the price to come back and cross again.
+
+Percent rules (`percent_move`) are converted to a fixed threshold relative
+to the last observed price at creation time.
+
+Limits
+- At most `max_rules` rules are active at once (ALERT_MAX_RULES, default
+  200000); further `add_rule` calls raise ValueError until rules fire or are
+  cancelled.
+"""
+
+import asyncio
+import bisect
+import enum
+import itertools
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+MAX_ACTIVE_RULES: int = int(os.getenv("ALERT_MAX_RULES", "200000"))
+
+
+class AlertDirection(enum.Enum):
+    ABOVE = "above"
+    BELOW = "below"
+
+
+@dataclass
+class AlertRule:
+    id: int
+    symbol: str
+    direction: AlertDirection
+    threshold: float
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class AlertTrigger:
+    rule: AlertRule
+    previous_price: float
+    price: float
+    triggered_at: float
+
+
+class _SymbolRules:
+    __slots__ = ("above", "below")
+
+    def __init__(self) -> None:
+        self.above: list[tuple[float, int]] = []
+        self.below: list[tuple[float, int]] = []
+
+
+class AlertEngine:
+    """Index of one-shot threshold rules evaluated on every tick."""
+
+    def __init__(self, subscriber_queue_size: int = 1000, max_rules: int = MAX_ACTIVE_RULES) -> None:
+        self._books: dict[str, _SymbolRules] = {}
+        self._rules: dict[int, AlertRule] = {}
+        self._last: dict[str, float] = {}
+        self._ids = itertools.count(1)
+        self._subscribers: set[asyncio.Queue] = set()
+        self._queue_size = subscriber_queue_size
+        self.max_rules = max_rules
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        return self._last.get(symbol)
+
+    def observe(self, symbol: str, price: float) -> None:
+        """Record a reference price without evaluating rules."""
+        self._last[symbol] = price
+
+    def add_rule(self, symbol: str, direction: AlertDirection, threshold: float) -> AlertRule:
+        if len(self._rules) >= self.max_rules:
+            raise ValueError(f"Too many active alerts (max {self.max_rules})")
+        rule = AlertRule(id=next(self._ids), symbol=symbol, direction=direction, threshold=threshold)
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolRules()
+        side = book.above if direction is AlertDirection.ABOVE else book.below
+        bisect.insort(side, (threshold, rule.id))
+        self._rules[rule.id] = rule
+        return rule
+
+    def add_percent_rule(self, symbol: str, percent_move: float) -> AlertRule:
+        """Add a rule `percent_move`% away from the last price (sign picks the side)."""
+        reference = self._last.get(symbol)
+        if reference is None:
+            raise ValueError(f"No price observed yet for {symbol}")
+        if percent_move == 0:
+            raise ValueError("percentMove must be non-zero")
+        direction = AlertDirection.ABOVE if percent_move > 0 else AlertDirection.BELOW
+        return self.add_rule(symbol, direction, reference * (1 + percent_move / 100))
+
+    def get(self, rule_id: int) -> Optional[AlertRule]:
+        return self._rules.get(rule_id)
+
+    def cancel(self, rule_id: int) -> bool:
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        book = self._books[rule.symbol]
+        side = book.above if rule.direction is AlertDirection.ABOVE else book.below
+        i = bisect.bisect_left(side, (rule.threshold, rule.id))
+        if i < len(side) and side[i][1] == rule.id:
+            del side[i]
+        return True
+
+    def on_tick(self, symbol: str, price: float) -> list[AlertTrigger]:
+        """Fire and remove every rule crossed by the move to `price`."""
+        prev = self._last.get(symbol)
+        self._last[symbol] = price
+        book = self._books.get(symbol)
+        if prev is None or book is None or price == prev:
+            return []
+        if price > prev:
+            side = book.above
+            # prev < threshold <= price
+            lo = bisect.bisect_right(side, (prev, math.inf))
+            hi = bisect.bisect_right(side, (price, math.inf))
+        else:
+            side = book.below
+            # price <= threshold < prev
+            lo = bisect.bisect_left(side, (price, -math.inf))
+            hi = bisect.bisect_left(side, (prev, -math.inf))
+        if lo == hi:
+            return []
+        fired = side[lo:hi]
+        del side[lo:hi]
+        now = time.time()
+        triggers = [
+            AlertTrigger(rule=self._rules.pop(rule_id), previous_price=prev, price=price, triggered_at=now)
+            for _, rule_id in fired
+        ]
+        self._publish(triggers)
+        return triggers
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _publish(self, triggers: list[AlertTrigger]) -> None:
+        for queue in self._subscribers:
+            for trigger in triggers:
+                try:
+                    queue.put_nowait(trigger)
+                except asyncio.QueueFull:
+                    # A stalled subscriber must not block tick evaluation.
+                    self.dropped += 1
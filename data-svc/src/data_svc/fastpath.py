@@ -0,0 +1,271 @@
+"""
+Pre-serialized fast path for `prices` subscriptions.
+
+The regular path decodes each Kafka record into a dict, builds a `Price`
+object, lets Strawberry resolve every field and then JSON-encodes the
+result. For the common selections (a single `prices` field selecting plain
+`Price` scalars) that work is redundant: the record already has the shape
+of the GraphQL type.
+
+At subscribe time `compile_prices_plan` inspects the document once. When it
+qualifies, the WebSocket handler skips GraphQL execution and writes `next`
+frames built by the plan:
+- raw: the selection is exactly `symbol price changePercent timestamp`, so
+  the record bytes are spliced into the frame (only the snake_case key is
+  renamed)
+- decoded: any other subset/order/aliasing of scalar fields is rendered
+  from the decoded record with per-field encoders compiled up front
+
+Anything else (fragments, directives, extra root fields, invalid documents
+or variables) returns None and the operation runs through Strawberry as
+before, so errors are reported exactly as on the regular path.
+"""
+
+import asyncio
+import json
+from contextlib import suppress
+from typing import Any, Callable, Optional
+
+from graphql import (
+    FieldNode,
+    GraphQLError,
+    OperationDefinitionNode,
+    OperationType,
+    parse,
+    validate,
+)
+from graphql.execution.values import get_variable_values
+from starlette.websockets import WebSocketDisconnect
+from strawberry.asgi import ASGIWebSocketAdapter
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http.exceptions import WebSocketDisconnected
+from strawberry.subscriptions.protocols.graphql_transport_ws.handlers import Operation
+from strawberry.types.graphql import OperationType as StrawberryOperationType
+
+from .kafka_utils import KAFKA_PRICE_TOPIC, create_started_consumer, decode_price
+from .tracing import (
+    LATENCY,
+    CONSUMER_STAGES,
+    TraceContext,
+    TracingGraphQLTransportWSHandler,
+    open_trace_slot,
+)
+
+
+# GraphQL field name -> (record key, coercion) for the `Price` type.
+PRICE_FIELDS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "symbol": ("symbol", str),
+    "price": ("price", float),
+    "changePercent": ("change_percent", float),
+    "timestamp": ("timestamp", str),
+}
+FULL_SELECTION: tuple[str, ...] = ("symbol", "price", "changePercent", "timestamp")
+
+# encode_price emits json.dumps of a dict in this exact key order.
+_RAW_PREFIX = b'{"symbol": '
+_RAW_KEY = '"change_percent": '
+_RAW_KEY_RENAMED = '"changePercent": '
+
+
+class PricesPlan:
+    """Precompiled serializer for one `prices` subscription selection."""
+
+    __slots__ = ("response_key", "raw", "_fields")
+
+    def __init__(self, response_key: str, selection: list[tuple[str, str]]) -> None:
+        self.response_key = response_key
+        # Raw splicing keeps the record's key names, so aliases rule it out.
+        self.raw = tuple(key for key, _ in selection) == FULL_SELECTION and all(
+            key == name for key, name in selection
+        )
+        self._fields: list[tuple[str, Optional[str], Callable[[Any], Any]]] = []
+        for key, name in selection:
+            prefix = json.dumps(key) + ":"
+            if name == "__typename":
+                self._fields.append((prefix, None, lambda _: "Price"))
+            else:
+                source, coerce = PRICE_FIELDS[name]
+                self._fields.append((prefix, source, coerce))
+
+    def frame_affixes(self, operation_id: str) -> tuple[str, str]:
+        """Return the constant text around the price object for an operation."""
+        head = '{"id":%s,"type":"next","payload":{"data":{%s:[' % (
+            json.dumps(operation_id),
+            json.dumps(self.response_key),
+        )
+        return head, "]}}}"
+
+    def render(self, value: bytes) -> Optional[str]:
+        """Serialize one Kafka record into the JSON price object, or None to skip."""
+        if self.raw and value.startswith(_RAW_PREFIX):
+            try:
+                text = value.decode("utf-8")
+            except UnicodeDecodeError:
+                return None
+            if _RAW_KEY in text:
+                return text.replace(_RAW_KEY, _RAW_KEY_RENAMED, 1)
+        data = decode_price(value)
+        if not data:
+            return None
+        parts = []
+        try:
+            for prefix, source, coerce in self._fields:
+                parts.append(prefix + json.dumps(coerce(data.get(source) if source else None)))
+        except (TypeError, ValueError):
+            return None
+        return "{" + ",".join(parts) + "}"
+
+
+def compile_prices_plan(
+    schema: Any,
+    query: Optional[str],
+    variables: Optional[dict[str, Any]],
+    operation_name: Optional[str],
+) -> Optional[PricesPlan]:
+    """Return a PricesPlan when the document qualifies for the fast path."""
+    if not isinstance(query, str):
+        return None
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return None
+    operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+    if len(operations) != len(document.definitions):
+        return None
+    if operation_name is None:
+        if len(operations) != 1:
+            return None
+        operation = operations[0]
+    else:
+        matches = [o for o in operations if o.name and o.name.value == operation_name]
+        if len(matches) != 1:
+            return None
+        operation = matches[0]
+    if operation.operation != OperationType.SUBSCRIPTION or operation.directives:
+        return None
+
+    roots = operation.selection_set.selections
+    if len(roots) != 1 or not isinstance(roots[0], FieldNode):
+        return None
+    root = roots[0]
+    if root.name.value != "prices" or root.directives or root.selection_set is None:
+        return None
+
+    selection: list[tuple[str, str]] = []
+    for node in root.selection_set.selections:
+        if not isinstance(node, FieldNode) or node.directives or node.arguments or node.selection_set:
+            return None
+        name = node.name.value
+        if name not in PRICE_FIELDS and name != "__typename":
+            return None
+        selection.append((node.alias.value if node.alias else name, name))
+    if len({key for key, _ in selection}) != len(selection):
+        return None
+
+    graphql_schema = schema._schema
+    if validate(graphql_schema, document):
+        return None
+    coerced = get_variable_values(graphql_schema, operation.variable_definitions or [], variables or {})
+    if isinstance(coerced, list):
+        return None
+
+    response_key = root.alias.value if root.alias else root.name.value
+    return PricesPlan(response_key, selection)
+
+
+class FrameWebSocketAdapter(ASGIWebSocketAdapter):
+    """ASGI adapter that can also send an already-encoded text frame."""
+
+    async def send_frame(self, frame: str) -> None:
+        # Same disconnect contract as `send_json`, minus the encode step.
+        try:
+            await self.ws.send_text(frame)
+        except WebSocketDisconnect as exc:
+            raise WebSocketDisconnected from exc
+
+
+class FastPathGraphQLTransportWSHandler(TracingGraphQLTransportWSHandler):
+    """Tracing handler that serves qualifying `prices` subscriptions directly."""
+
+    async def handle_subscribe(self, message) -> None:
+        plan: Optional[PricesPlan] = None
+        payload = message.get("payload") or {}
+        if (
+            self.connection_acknowledged
+            and message.get("id") not in self.operations
+            and isinstance(self.websocket, FrameWebSocketAdapter)
+        ):
+            plan = compile_prices_plan(
+                self.schema,
+                payload.get("query"),
+                payload.get("variables"),
+                payload.get("operationName"),
+            )
+        if plan is None:
+            await super().handle_subscribe(message)
+            return
+
+        # Needed if the fast operation falls back to the regular path.
+        open_trace_slot()
+        operation = Operation(
+            self,
+            message["id"],
+            StrawberryOperationType.SUBSCRIPTION,
+            payload["query"],
+            payload.get("variables"),
+            payload.get("operationName"),
+        )
+        operation.task = asyncio.create_task(self.run_fast_operation(operation, plan))
+        self.operations[message["id"]] = operation
+
+    async def run_fast_operation(self, operation: Operation, plan: PricesPlan) -> None:
+        """Stream pre-serialized frames; falls back to the regular path without Kafka."""
+        try:
+            consumer = await create_started_consumer(KAFKA_PRICE_TOPIC, group_id=None)
+        except Exception:
+            consumer = None
+        if consumer is None:
+            # The regular path reports the unavailable consumer (or the
+            # broker error) as usual.
+            await self.run_operation(operation)
+            return
+        head, tail = plan.frame_affixes(operation.id)
+        send_frame = self.websocket.send_frame
+        try:
+            while not operation.completed:
+                message = await consumer.getone()
+                trace = TraceContext.from_headers(message.headers)
+                if trace is not None:
+                    trace.stamp("consume")
+                body = plan.render(message.value)
+                if body is None:
+                    continue
+                frame = head + body + tail
+                if trace is not None:
+                    trace.stamp("execute")
+                try:
+                    await send_frame(frame)
+                except WebSocketDisconnected:
+                    break
+                if trace is not None:
+                    trace.stamp("socket_write")
+                    LATENCY.record_trace(trace, CONSUMER_STAGES)
+        except Exception as error:  # pragma: no cover
+            await self.handle_task_exception(error)
+            with suppress(Exception):
+                await operation.send_operation_message({"id": operation.id, "type": "complete"})
+            self.operations.pop(operation.id, None)
+            raise
+        finally:
+            with suppress(Exception):
+                await consumer.stop()
+            task = asyncio.current_task()
+            assert task is not None
+            self.completed_tasks.append(task)
+
+
+class FastPathGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter serving qualifying `prices` subscriptions via the fast path."""
+
+    graphql_transport_ws_handler_class = FastPathGraphQLTransportWSHandler
+    websocket_adapter_class = FrameWebSocketAdapter
@@ -0,0 +1,263 @@
+"""
+Incremental technical indicators for data-svc.
+
+Every indicator updates in O(1) per tick from recurrence formulas or running
+sums over a fixed-size ring buffer, so the cost of a tick does not depend on
+the window length and memory per indicator is bounded by its period.
+
+Kinds
+- EMA: exponential moving average, alpha = 2 / (period + 1), seeded with the
+  simple average of the first `period` prices.
+- VWAP: rolling volume-weighted average price over the last `period` ticks.
+  The simulator has no traded volume, so ticks are fed with volume 1 and
+  this reduces to a rolling mean until real volume is available.
+- BOLLINGER: rolling mean +/- `width` population standard deviations over
+  the last `period` prices (running sum and sum of squares).
+- RSI: Wilder's relative strength index with smoothed average gain/loss.
+
+Limits
+- `period` is capped at MAX_PERIOD so ring buffers stay small, and a single
+  subscription may track at most MAX_INDICATORS_PER_SUBSCRIPTION
+  symbol x kind combinations.
+
+Sharing
+- IndicatorEngine keeps one instance per (symbol, kind, period, width).
+  Subscribers `acquire` instances and `release` them when done; instances
+  are reference-counted and dropped when the last subscriber leaves.
+"""
+
+import abc
+import enum
+import math
+from typing import Optional
+
+
+MAX_PERIOD = 1000
+MAX_INDICATORS_PER_SUBSCRIPTION = 100
+
+
+class IndicatorKind(enum.Enum):
+    EMA = "ema"
+    VWAP = "vwap"
+    BOLLINGER = "bollinger"
+    RSI = "rsi"
+
+
+class _Ring:
+    """Fixed-size circular buffer of floats."""
+
+    __slots__ = ("values", "size", "index", "filled")
+
+    def __init__(self, size: int) -> None:
+        self.values = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.filled = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """Store `value` and return the value it evicted (None while filling)."""
+        evicted = self.values[self.index] if self.filled == self.size else None
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.filled < self.size:
+            self.filled += 1
+        return evicted
+
+
+class Indicator(abc.ABC):
+    """Base class: `update` per tick, then read `value`/`upper`/`lower`."""
+
+    __slots__ = ("symbol", "period", "value", "upper", "lower")
+
+    kind: IndicatorKind
+
+    def __init__(self, symbol: str, period: int) -> None:
+        self.symbol = symbol
+        self.period = period
+        self.value: Optional[float] = None
+        self.upper: Optional[float] = None
+        self.lower: Optional[float] = None
+
+    @abc.abstractmethod
+    def update(self, price: float, volume: float) -> None:
+        """Fold one tick into the indicator in O(1)."""
+
+
+class Ema(Indicator):
+    kind = IndicatorKind.EMA
+    __slots__ = ("alpha", "_count", "_seed_sum")
+
+    def __init__(self, symbol: str, period: int) -> None:
+        super().__init__(symbol, period)
+        self.alpha = 2.0 / (period + 1)
+        self._count = 0
+        self._seed_sum = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        if self.value is not None:
+            self.value += self.alpha * (price - self.value)
+            return
+        self._count += 1
+        self._seed_sum += price
+        if self._count == self.period:
+            self.value = self._seed_sum / self.period
+
+
+class Vwap(Indicator):
+    kind = IndicatorKind.VWAP
+    __slots__ = ("_pv", "_v", "_pv_sum", "_v_sum")
+
+    def __init__(self, symbol: str, period: int) -> None:
+        super().__init__(symbol, period)
+        self._pv = _Ring(period)
+        self._v = _Ring(period)
+        self._pv_sum = 0.0
+        self._v_sum = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        old_pv = self._pv.push(price * volume)
+        old_v = self._v.push(volume)
+        self._pv_sum += price * volume - (old_pv or 0.0)
+        self._v_sum += volume - (old_v or 0.0)
+        if self._v.filled == self.period and self._v_sum > 0:
+            self.value = self._pv_sum / self._v_sum
+
+
+class Bollinger(Indicator):
+    kind = IndicatorKind.BOLLINGER
+    __slots__ = ("width", "_window", "_sum", "_sum_sq")
+
+    def __init__(self, symbol: str, period: int, width: float = 2.0) -> None:
+        super().__init__(symbol, period)
+        self.width = width
+        self._window = _Ring(period)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        old = self._window.push(price)
+        if old is not None:
+            self._sum -= old
+            self._sum_sq -= old * old
+        self._sum += price
+        self._sum_sq += price * price
+        if self._window.filled < self.period:
+            return
+        mean = self._sum / self.period
+        # clamp: running sums can drift slightly negative for flat prices
+        std = math.sqrt(max(0.0, self._sum_sq / self.period - mean * mean))
+        self.value = mean
+        self.upper = mean + self.width * std
+        self.lower = mean - self.width * std
+
+
+class Rsi(Indicator):
+    kind = IndicatorKind.RSI
+    __slots__ = ("_prev", "_count", "_avg_gain", "_avg_loss")
+
+    def __init__(self, symbol: str, period: int) -> None:
+        super().__init__(symbol, period)
+        self._prev: Optional[float] = None
+        self._count = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def update(self, price: float, volume: float) -> None:
+        prev, self._prev = self._prev, price
+        if prev is None:
+            return
+        change = price - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.period
+        if self._count < n:
+            # seed with simple averages over the first `period` changes
+            self._count += 1
+            self._avg_gain += (gain - self._avg_gain) / self._count
+            self._avg_loss += (loss - self._avg_loss) / self._count
+            if self._count < n:
+                return
+        else:
+            self._avg_gain = (self._avg_gain * (n - 1) + gain) / n
+            self._avg_loss = (self._avg_loss * (n - 1) + loss) / n
+        if self._avg_loss == 0:
+            self.value = 100.0 if self._avg_gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+
+_MIN_PERIOD: dict[IndicatorKind, int] = {
+    IndicatorKind.EMA: 1,
+    IndicatorKind.VWAP: 1,
+    IndicatorKind.BOLLINGER: 2,
+    IndicatorKind.RSI: 1,
+}
+
+
+def create_indicator(symbol: str, kind: IndicatorKind, period: int, width: float = 2.0) -> Indicator:
+    if period < _MIN_PERIOD[kind]:
+        raise ValueError(f"{kind.name} period must be >= {_MIN_PERIOD[kind]}")
+    if period > MAX_PERIOD:
+        raise ValueError(f"period must be <= {MAX_PERIOD}")
+    if kind is IndicatorKind.EMA:
+        return Ema(symbol, period)
+    if kind is IndicatorKind.VWAP:
+        return Vwap(symbol, period)
+    if kind is IndicatorKind.BOLLINGER:
+        return Bollinger(symbol, period, width)
+    return Rsi(symbol, period)
+
+
+IndicatorKey = tuple[str, IndicatorKind, int, float]
+
+
+class IndicatorEngine:
+    """Shared, reference-counted indicator instances updated per tick."""
+
+    def __init__(self) -> None:
+        self._instances: dict[IndicatorKey, tuple[Indicator, int]] = {}
+        # Hot-path index: symbol -> indicators to update on its ticks
+        self._by_symbol: dict[str, list[Indicator]] = {}
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    @staticmethod
+    def _key(symbol: str, kind: IndicatorKind, period: int, width: float) -> IndicatorKey:
+        # width only distinguishes Bollinger instances
+        return (symbol, kind, period, width if kind is IndicatorKind.BOLLINGER else 0.0)
+
+    def acquire(self, symbol: str, kind: IndicatorKind, period: int, width: float = 2.0) -> Indicator:
+        key = self._key(symbol, kind, period, width)
+        entry = self._instances.get(key)
+        if entry is not None:
+            indicator, refs = entry
+            self._instances[key] = (indicator, refs + 1)
+            return indicator
+        indicator = create_indicator(symbol, kind, period, width)
+        self._instances[key] = (indicator, 1)
+        self._by_symbol.setdefault(symbol, []).append(indicator)
+        return indicator
+
+    def release(self, indicator: Indicator) -> None:
+        width = getattr(indicator, "width", 0.0)
+        key = self._key(indicator.symbol, indicator.kind, indicator.period, width)
+        entry = self._instances.get(key)
+        if entry is None or entry[0] is not indicator:
+            return
+        refs = entry[1] - 1
+        if refs > 0:
+            self._instances[key] = (indicator, refs)
+            return
+        del self._instances[key]
+        active = self._by_symbol[indicator.symbol]
+        active.remove(indicator)
+        if not active:
+            del self._by_symbol[indicator.symbol]
+
+    def on_tick(self, symbol: str, price: float, volume: float = 1.0) -> None:
+        indicators = self._by_symbol.get(symbol)
+        if indicators is None:
+            return
+        for indicator in indicators:
+            indicator.update(price, volume)
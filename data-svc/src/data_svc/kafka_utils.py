@@ -8,7 +8,10 @@ Responsibilities
 - Read configuration from environment variables
 - Lazily create and cache a single AIOKafkaProducer instance
 - Encode a Price-like object into a JSON payload matching the GraphQL shape
-- Publish an iterable of bytes to a Kafka topic
+- Encode/decode compact order-book deltas
+- Publish an iterable of bytes to a Kafka topic, optionally keyed
+- Publish traced payloads with trace headers and record producer-side
+  stage latencies (see `data_svc.tracing`)
 - Fail safely (no-ops) when Kafka is disabled or unavailable
 
 Environment variables
@@ -16,6 +19,7 @@ Environment variables
 - KAFKA_BOOTSTRAP_SERVERS: Kafka bootstrap servers (default: "kafka:9092").
   Optional override; comma-separated host:port entries are supported.
 - KAFKA_PRICE_TOPIC: topic name for price events (default: "prices")
+- KAFKA_BOOK_TOPIC: topic name for order-book deltas (default: "orderbook")
 
 Usage
     from .kafka_utils import KAFKA_ENABLED, KAFKA_PRICE_TOPIC, encode_price, publish_batch
@@ -26,8 +30,9 @@ Usage
         )
 
 Note: publish_batch awaits each send to preserve ordering guarantees while
-remaining simple. In high-throughput scenarios consider batching or fire-and-
-forget sends with careful backpressure handling.
+remaining simple. The price publisher uses publish_traced instead, which
+pipelines a whole batch before awaiting acks; order-book deltas go through
+publish_keyed_batch so they are keyed (and partitioned) by symbol.
 """
 
 import os
@@ -35,10 +40,13 @@ import json
 import logging
 from typing import Optional, Iterable
 
+from .orderbook import BookDelta, BookSide, LevelAction
+from .tracing import LATENCY, PRODUCER_STAGES, TraceContext
 
 KAFKA_ENABLED: bool = os.getenv("ENABLE_KAFKA", "false").lower() in {"1", "true", "yes"}
 KAFKA_BOOTSTRAP: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
 KAFKA_PRICE_TOPIC: str = os.getenv("KAFKA_PRICE_TOPIC", "prices")
+KAFKA_BOOK_TOPIC: str = os.getenv("KAFKA_BOOK_TOPIC", "orderbook")
 
 
 try:
@@ -71,20 +79,75 @@ async def ensure_producer() -> Optional["AIOKafkaProducer"]:
     return _producer
 
 
-async def publish_batch(topic: str, values: Iterable[bytes]) -> None:
+async def publish_batch(topic: str, values: Iterable[bytes]) -> int:
     """Publish an iterable of byte payloads to a topic.
 
     Ensures a producer exists. If unavailable, returns without error.
     Logs (warn) on failures but does not raise to avoid impacting callers.
+    Returns how many payloads were acknowledged, so callers can account for
+    the rest as dropped.
     """
     producer = await ensure_producer()
     if producer is None:
-        return
+        return 0
+    sent = 0
     try:
         for value in values:
             await producer.send_and_wait(topic, value)
+            sent += 1
     except Exception as exc:  # pragma: no cover
         logging.warning("Kafka publish failed: %s", exc)
+    return sent
+
+
+async def publish_keyed_batch(topic: str, items: Iterable[tuple[bytes, bytes]]) -> int:
+    """Publish `(key, value)` pairs to a topic.
+
+    Keys let consumers skip records by key without decoding the value, and
+    route a key to a single partition so its records stay ordered. Sends are
+    pipelined like `publish_traced`. Same failure semantics and return value
+    as `publish_batch`.
+    """
+    producer = await ensure_producer()
+    if producer is None:
+        return 0
+    sent = 0
+    try:
+        pending = [await producer.send(topic, value, key=key) for key, value in items]
+        for ack in pending:
+            await ack
+            sent += 1
+    except Exception as exc:  # pragma: no cover
+        logging.warning("Kafka publish failed: %s", exc)
+    return sent
+
+
+async def publish_traced(topic: str, items: Iterable[tuple[bytes, TraceContext]]) -> int:
+    """Publish payloads with their trace as Kafka headers.
+
+    All sends are enqueued on the producer before any ack is awaited so a
+    batch shares broker round trips; per-partition order is preserved by
+    the producer. Each trace is stamped with `produce_ack` once its send is
+    acknowledged, and the producer-side stages are recorded into the latency
+    histograms. Same failure semantics and return value as `publish_batch`.
+    """
+    producer = await ensure_producer()
+    if producer is None:
+        return 0
+    sent = 0
+    try:
+        pending = []
+        for value, trace in items:
+            ack = await producer.send(topic, value, headers=trace.to_headers())
+            pending.append((ack, trace))
+        for ack, trace in pending:
+            await ack
+            sent += 1
+            trace.stamp("produce_ack")
+            LATENCY.record_trace(trace, PRODUCER_STAGES)
+    except Exception as exc:  # pragma: no cover
+        logging.warning("Kafka publish failed: %s", exc)
+    return sent
 
 
 def encode_price(item: object) -> bytes:
@@ -117,6 +180,31 @@ def decode_price(value: bytes) -> dict:
     }
 
 
+def encode_book_delta(delta: BookDelta) -> bytes:
+    """Encode an order-book delta as compact JSON (prices in integer ticks)."""
+    # Built by hand: json.dumps over nested lists dominated the per-step cost
+    parts = [
+        f'["b","{action.value}",{price},{size}]' for price, (action, size) in delta.bids.items()
+    ]
+    parts.extend(f'["a","{action.value}",{price},{size}]' for price, (action, size) in delta.asks.items())
+    symbol = json.dumps(delta.symbol)
+    return (
+        f'{{"s":{symbol},"t":{delta.tick!r},"p":{delta.prev_seq},"q":{delta.seq},"u":[{",".join(parts)}]}}'
+    ).encode("utf-8")
+
+
+def decode_book_delta(value: bytes) -> Optional[BookDelta]:
+    """Decode an order-book delta; None for malformed payloads."""
+    try:
+        obj = json.loads(value.decode("utf-8"))
+        delta = BookDelta(symbol=str(obj["s"]), prev_seq=int(obj["p"]), seq=int(obj["q"]), tick=float(obj["t"]))
+        for side, action, price, size in obj["u"]:
+            delta.side(BookSide(side))[int(price)] = (LevelAction(action), int(size))
+    except Exception:
+        return None
+    return delta
+
+
 async def create_started_consumer(topic: str, group_id: str | None = None):
     """Create and start a consumer subscribed to topic or return None if disabled.
 
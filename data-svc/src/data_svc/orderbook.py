@@ -0,0 +1,269 @@
+"""
+Simulated Level-2 order books for data-svc.
+
+Each symbol gets an N-level bid/ask book that follows the simulated last
+price. Prices are kept as integer ticks in fixed-size `array` ladders (best
+level first), so memory per symbol is constant and a step is O(N).
+
+Incremental updates
+- Every step diffs the new ladders against the previous ones and produces a
+  BookDelta of level changes: ADD (new price level), MODIFY (size change) or
+  DELETE (level removed). Each change carries the level's final size, so
+  applying a change is idempotent.
+- Deltas carry `prev_seq` -> `seq`. A consumer holding a book at sequence
+  `s` can apply any delta with `prev_seq <= s < seq`; `prev_seq > s` means a
+  gap and the consumer must re-snapshot.
+- `merge_deltas` combines two consecutive deltas into one equivalent delta,
+  which lets the publisher conflate unsent deltas per symbol during broker
+  stalls without losing correctness. Merged deltas keep every level touched
+  in the range (with its final size, or DELETE), so they are also correct
+  for a consumer whose snapshot falls inside the range.
+
+Wire format (compact JSON, one message per delta; see
+`kafka_utils.encode_book_delta`)
+    {"s": "AAPL", "t": 0.01, "p": 41, "q": 42,
+     "u": [["b", "a", 18912, 300], ["a", "d", 18930, 0], ...]}
+- t: tick size; prices in `u` are integer ticks
+- u: [side ("b"/"a"), action ("a"/"m"/"d"), price_ticks, size]
+"""
+
+import enum
+import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+DEFAULT_LEVELS = 10
+DEFAULT_TICK = 0.01
+
+
+class BookSide(enum.Enum):
+    BID = "b"
+    ASK = "a"
+
+
+class LevelAction(enum.Enum):
+    ADD = "a"
+    MODIFY = "m"
+    DELETE = "d"
+
+
+LevelChanges = dict[int, tuple[LevelAction, int]]  # price_ticks -> (action, size)
+
+
+@dataclass
+class BookDelta:
+    """Level changes taking a symbol's book from `prev_seq` to `seq`."""
+
+    symbol: str
+    prev_seq: int
+    seq: int
+    tick: float
+    # One dict per side keyed by integer price ticks; int keys keep the hot
+    # path off enum hashing.
+    bids: LevelChanges = field(default_factory=dict)
+    asks: LevelChanges = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.bids) + len(self.asks)
+
+    def side(self, side: BookSide) -> LevelChanges:
+        return self.bids if side is BookSide.BID else self.asks
+
+
+def _merge_side(changes: LevelChanges, newer: LevelChanges) -> None:
+    for price, (action, size) in newer.items():
+        previous = changes.get(price)
+        if previous is None:
+            changes[price] = (action, size)
+            continue
+        prev_action = previous[0]
+        if action is LevelAction.DELETE:
+            # Keep the DELETE even when the level was added within the merged
+            # range: a consumer that snapshotted mid-range already holds it.
+            changes[price] = (LevelAction.DELETE, 0)
+        elif prev_action is LevelAction.ADD:
+            changes[price] = (LevelAction.ADD, size)
+        elif prev_action is LevelAction.DELETE:
+            changes[price] = (LevelAction.MODIFY, size)
+        else:
+            changes[price] = (action, size)
+
+
+def merge_deltas(older: BookDelta, newer: BookDelta) -> BookDelta:
+    """Combine consecutive deltas for one symbol into a single equivalent delta.
+
+    `older` is updated in place and returned.
+    """
+    _merge_side(older.bids, newer.bids)
+    _merge_side(older.asks, newer.asks)
+    older.seq = newer.seq
+    return older
+
+
+class SimulatedBook:
+    """Array-backed N-level book for one symbol."""
+
+    __slots__ = ("symbol", "levels", "tick", "seq", "bid_px", "bid_sz", "ask_px", "ask_sz", "_rng")
+
+    def __init__(self, symbol: str, last_price: float, levels: int, tick: float, rng: random.Random) -> None:
+        self.symbol = symbol
+        self.levels = levels
+        self.tick = tick
+        self.seq = 0
+        self._rng = rng
+        self.bid_px = array("q", [0] * levels)
+        self.bid_sz = array("q", [0] * levels)
+        self.ask_px = array("q", [0] * levels)
+        self.ask_sz = array("q", [0] * levels)
+        best_bid, best_ask = self._best(last_price)
+        for i in range(levels):
+            self.bid_px[i] = best_bid - i
+            self.bid_sz[i] = self._fresh_size()
+            self.ask_px[i] = best_ask + i
+            self.ask_sz[i] = self._fresh_size()
+
+    def _fresh_size(self) -> int:
+        # 100..1000 in round lots; random() is much cheaper than randrange()
+        return (int(self._rng.random() * 10) + 1) * 100
+
+    def _best(self, last_price: float) -> tuple[int, int]:
+        mid = round(last_price / self.tick)
+        half_spread = 1 if self._rng.random() < 0.5 else 2
+        return mid - half_spread, mid + half_spread
+
+    def step(self, last_price: float) -> BookDelta:
+        """Re-center the ladders on `last_price`, jitter sizes, return the diff."""
+        delta = BookDelta(symbol=self.symbol, prev_seq=self.seq, seq=self.seq + 1, tick=self.tick)
+        best_bid, best_ask = self._best(last_price)
+        self._step_side(self.bid_px, self.bid_sz, best_bid, -1, delta.bids)
+        self._step_side(self.ask_px, self.ask_sz, best_ask, 1, delta.asks)
+        self.seq = delta.seq
+        return delta
+
+    def _step_side(self, px: array, sz: array, best: int, direction: int, changes: LevelChanges) -> None:
+        # Ladders are contiguous, so new level i (best + direction*i) was at
+        # old index i + shift: no per-step price lookup table is needed.
+        n = self.levels
+        rng = self._rng
+        shift = (best - px[0]) * direction
+        if shift >= n or shift <= -n:
+            # jumped past the whole ladder: every level is replaced
+            for i in range(n):
+                changes[px[i]] = (LevelAction.DELETE, 0)
+                price = best + direction * i
+                size = sz[i] = self._fresh_size()
+                px[i] = price
+                changes[price] = (LevelAction.ADD, size)
+            return
+        old_sz = sz.tolist()
+        old_px = px.tolist()
+        for i in range(n):
+            price = best + direction * i
+            j = i + shift
+            if 0 <= j < n:
+                size = old_sz[j]
+                r = rng.random()
+                if r < 0.3:
+                    # reuse the draw: uniform -300..+300 in round lots, min one lot
+                    new_size = max(100, size + (int(r / 0.3 * 7) - 3) * 100)
+                    if new_size != size:
+                        size = new_size
+                        changes[price] = (LevelAction.MODIFY, size)
+            else:
+                size = self._fresh_size()
+                changes[price] = (LevelAction.ADD, size)
+            px[i] = price
+            sz[i] = size
+        # old levels that fell off the far end (or moved through the spread)
+        for j in range(n):
+            if not 0 <= j - shift < n:
+                changes[old_px[j]] = (LevelAction.DELETE, 0)
+
+    def snapshot(self, depth: Optional[int] = None) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        n = self.levels if depth is None else min(depth, self.levels)
+        bids = [(self.bid_px[i], self.bid_sz[i]) for i in range(n)]
+        asks = [(self.ask_px[i], self.ask_sz[i]) for i in range(n)]
+        return bids, asks
+
+
+class OrderBookSimulator:
+    """Books for every ticking symbol, created on first tick."""
+
+    def __init__(self, levels: int = DEFAULT_LEVELS, tick: float = DEFAULT_TICK, seed: int = 7) -> None:
+        self.levels = levels
+        self.tick = tick
+        self._rng = random.Random(seed)
+        self._books: dict[str, SimulatedBook] = {}
+
+    def get(self, symbol: str) -> Optional[SimulatedBook]:
+        return self._books.get(symbol)
+
+    def on_tick(self, symbol: str, price: float) -> Optional[BookDelta]:
+        """Step `symbol`'s book to `price`; None when the book was just created."""
+        book = self._books.get(symbol)
+        if book is None:
+            self._books[symbol] = SimulatedBook(symbol, price, self.levels, self.tick, self._rng)
+            return None
+        return book.step(price)
+
+
+class LocalBook:
+    """Consumer-side book rebuilt from a snapshot plus deltas."""
+
+    __slots__ = ("symbol", "tick", "seq", "bids", "asks")
+
+    def __init__(self, symbol: str, tick: float, seq: int, bids, asks) -> None:
+        self.symbol = symbol
+        self.tick = tick
+        self.seq = seq
+        self.bids: dict[int, int] = dict(bids)
+        self.asks: dict[int, int] = dict(asks)
+
+    @classmethod
+    def from_simulated(cls, book: SimulatedBook) -> "LocalBook":
+        bids, asks = book.snapshot()
+        return cls(book.symbol, book.tick, book.seq, bids, asks)
+
+    def apply(self, delta: BookDelta) -> bool:
+        """Apply `delta` if it continues this book; False on a sequence gap."""
+        if delta.seq <= self.seq:
+            return True  # already reflected
+        if delta.prev_seq > self.seq:
+            return False
+        for levels, changes in ((self.bids, delta.bids), (self.asks, delta.asks)):
+            for price, (action, size) in changes.items():
+                if action is LevelAction.DELETE:
+                    levels.pop(price, None)
+                else:
+                    levels[price] = size
+        self.seq = delta.seq
+        return True
+
+    def top(self, depth: int) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return bids, asks
+
+
+def diff_views(
+    before: tuple[list[tuple[int, int]], list[tuple[int, int]]],
+    after: tuple[list[tuple[int, int]], list[tuple[int, int]]],
+) -> list[tuple[BookSide, LevelAction, int, int]]:
+    """Level changes turning one top-of-book view into another."""
+    out: list[tuple[BookSide, LevelAction, int, int]] = []
+    for side, old_levels, new_levels in (
+        (BookSide.BID, before[0], after[0]),
+        (BookSide.ASK, before[1], after[1]),
+    ):
+        old = dict(old_levels)
+        for price, size in new_levels:
+            previous = old.pop(price, None)
+            if previous is None:
+                out.append((side, LevelAction.ADD, price, size))
+            elif previous != size:
+                out.append((side, LevelAction.MODIFY, price, size))
+        for price in old:
+            out.append((side, LevelAction.DELETE, price, 0))
+    return out
@@ -0,0 +1,80 @@
+"""
+Conflating outbox between tick generation and Kafka publishing.
+
+The tick generator writes the latest encoded price per symbol into the
+outbox and never awaits I/O. A separate sender task drains pending entries in
+batches. If the sender falls behind (e.g., the broker stalls), newer ticks
+for a symbol replace the unsent one instead of queueing, so memory stays
+bounded by the number of tracked symbols and subscribers see the freshest
+price once publishing resumes.
+
+Counters
+- enqueued: total `put` calls
+- conflated: puts that replaced (or were merged into) a still-unsent value
+  for the same key
+- drained: entries handed to the sender
+- dropped: drained entries the sender could not publish (no producer or a
+  failed send), reported back through `mark_dropped`
+"""
+
+import asyncio
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ConflatingOutbox(Generic[K, V]):
+    """Keyed last-value-wins buffer with an awaitable "has pending" signal."""
+
+    def __init__(self) -> None:
+        # dicts keep insertion order; a replaced key keeps its original slot
+        # so a hot symbol cannot starve others within a drain.
+        self._pending: dict[K, V] = {}
+        self._ready = asyncio.Event()
+        self.enqueued = 0
+        self.conflated = 0
+        self.drained = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, key: K, value: V, merge: Optional[Callable[[V, V], V]] = None) -> None:
+        """Store `value` as the latest unsent entry for `key`. Never blocks.
+
+        With `merge`, an unsent value is combined as `merge(pending, value)`
+        instead of replaced, for payloads such as deltas where every update
+        must be reflected.
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.conflated += 1
+            if merge is not None:
+                value = merge(pending, value)
+        self._pending[key] = value
+        self.enqueued += 1
+        self._ready.set()
+
+    def drain(self, max_items: int = 0) -> list[tuple[K, V]]:
+        """Remove and return up to `max_items` pending entries (0 = all)."""
+        if max_items <= 0 or max_items >= len(self._pending):
+            batch = list(self._pending.items())
+            self._pending.clear()
+        else:
+            batch = []
+            for key in list(self._pending)[:max_items]:
+                batch.append((key, self._pending.pop(key)))
+        if not self._pending:
+            self._ready.clear()
+        self.drained += len(batch)
+        return batch
+
+    def mark_dropped(self, count: int) -> None:
+        """Record `count` drained entries that never reached the broker."""
+        self.dropped += count
+
+    async def wait(self) -> None:
+        """Wait until at least one entry is pending."""
+        await self._ready.wait()
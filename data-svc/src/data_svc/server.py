@@ -3,19 +3,42 @@ GraphQL server for data-svc.
 
 This service exposes a Strawberry GraphQL API with:
 - Query: lightweight health-check via `ping`
+- Query: `latency` per-stage tick-to-socket latency histograms
+- Query: `publisherStats` outbox depth and conflation counters
+- Mutation: `createAlert` / `cancelAlert` server-side price alert rules
 - Subscription: `prices` stream that emits synthetic price updates for symbols
+- Subscription: `alerts` stream of fired alert rules
+- Subscription: `indicators` periodic EMA/VWAP/Bollinger/RSI snapshots
+- Subscription: `orderBook` Level-2 snapshot followed by level deltas
 
 Runtime behavior
 - Generates deterministic-but-jittered price movements for a tracked set
   of symbols, emitting updates at an adjustable cadence.
-- A background publisher task (started in the FastAPI lifespan) emits
-  per-symbol price events to the `prices` Kafka topic.
+- A background publisher task (started in the FastAPI lifespan) generates
+  ticks into a per-symbol conflating outbox without awaiting I/O; a sender
+  task drains it in batches to the `prices` Kafka topic. During broker
+  stalls only the latest unsent price per symbol is kept.
+- The publisher also evaluates alert rules on every generated tick using
+  per-symbol sorted thresholds (see `data_svc.alerts`), so alerts are only
+  live while the publisher runs.
+- Indicators are updated incrementally by the same loop; identical
+  (symbol, kind, params) requests share one instance (see
+  `data_svc.indicators`).
+- Each tick also steps a simulated N-level order book for the symbol; level
+  deltas are merged per symbol in a second outbox and published to the
+  `orderbook` topic (see `data_svc.orderbook`).
 - Subscriptions consume from Kafka and yield one `Price` per message
   (as a one-item list for a consistent GraphQL shape).
+- Each published price carries a trace id and per-stage nanosecond stamps
+  in Kafka headers; producer and subscriber hops record into the shared
+  latency histograms (see `data_svc.tracing`).
+- Simple `prices` selections skip per-field resolution and are written as
+  pre-serialized frames (see `data_svc.fastpath`).
 
 Environment
-- ENABLE_KAFKA, KAFKA_BOOTSTRAP_SERVERS, KAFKA_PRICE_TOPIC are read by
-  `data_svc.kafka_utils`.
+- ENABLE_KAFKA, KAFKA_BOOTSTRAP_SERVERS, KAFKA_PRICE_TOPIC, KAFKA_BOOK_TOPIC
+  are read by `data_svc.kafka_utils`.
+- ALERT_MAX_RULES caps active alert rules (see `data_svc.alerts`).
 
 Kafka bootstrap servers
 - Defaults to "kafka:9092" for simplicity. You can override via
@@ -25,6 +48,9 @@ Kafka bootstrap servers
 Lifecycle
 - Uses FastAPI's lifespan context to start/stop the background publisher
   cleanly, replacing deprecated `@app.on_event` startup/shutdown hooks.
+- The lifespan also runs the event-loop lag monitor; `/admin/loop-lag` and
+  `/admin/profile` expose it and an on-demand sampling profiler (see
+  `data_svc.diagnostics`).
 
 Integration
 - The API is mounted under `/graphql` on a FastAPI app and is typically
@@ -40,15 +66,34 @@ from contextlib import asynccontextmanager
 
 import strawberry
 from fastapi import FastAPI
-from strawberry.fastapi import GraphQLRouter
 from .kafka_utils import (
     KAFKA_ENABLED,
     KAFKA_PRICE_TOPIC,
+    KAFKA_BOOK_TOPIC,
     encode_price,
+    encode_book_delta,
     publish_batch,
+    publish_keyed_batch,
+    publish_traced,
     decode_price,
+    decode_book_delta,
     create_started_consumer,
 )
+from .alerts import AlertDirection, AlertEngine, AlertRule, AlertTrigger
+from .diagnostics import LOOP_MONITOR, create_admin_router
+from .fastpath import FastPathGraphQLRouter
+from .indicators import MAX_INDICATORS_PER_SUBSCRIPTION, IndicatorEngine, IndicatorKind
+from .orderbook import (
+    BookDelta,
+    BookSide,
+    LevelAction,
+    LocalBook,
+    OrderBookSimulator,
+    diff_views,
+    merge_deltas,
+)
+from .outbox import ConflatingOutbox
+from .tracing import LATENCY, STAGES, TOTAL_STAGE, TraceContext, set_current_trace
 
 
 # ----- Domain Types -----
@@ -65,6 +110,119 @@ class Price:
     timestamp: str
 
 
+# Registers the engine's enum with the schema (returns the same class).
+strawberry.enum(AlertDirection, description="Side of the threshold that triggers an alert.")
+
+
+@strawberry.type
+class Alert:
+    """An active (not yet triggered) price alert rule."""
+    id: int
+    symbol: str
+    direction: AlertDirection
+    threshold: float
+    created_at: str
+
+    @classmethod
+    def from_rule(cls, rule: AlertRule) -> "Alert":
+        return cls(
+            id=rule.id,
+            symbol=rule.symbol,
+            direction=rule.direction,
+            threshold=rule.threshold,
+            created_at=datetime.utcfromtimestamp(rule.created_at).isoformat() + "Z",
+        )
+
+
+@strawberry.type
+class AlertEvent:
+    """Emitted once when a tick crosses an alert's threshold."""
+    alert: Alert
+    previous_price: float
+    price: float
+    timestamp: str
+
+    @classmethod
+    def from_trigger(cls, trigger: AlertTrigger) -> "AlertEvent":
+        return cls(
+            alert=Alert.from_rule(trigger.rule),
+            previous_price=trigger.previous_price,
+            price=trigger.price,
+            timestamp=datetime.utcfromtimestamp(trigger.triggered_at).isoformat() + "Z",
+        )
+
+
+strawberry.enum(IndicatorKind, description="Streaming technical indicator.")
+
+
+@strawberry.type
+class IndicatorValue:
+    """Latest value of one indicator for one symbol.
+
+    `upper`/`lower` are only set for BOLLINGER bands; `value` is its mean.
+    """
+    symbol: str
+    kind: IndicatorKind
+    period: int
+    value: float
+    upper: Optional[float]
+    lower: Optional[float]
+    timestamp: str
+
+
+strawberry.enum(BookSide, description="Order-book side.")
+strawberry.enum(LevelAction, description="Kind of change to a price level.")
+
+
+@strawberry.type
+class BookLevel:
+    price: float
+    size: int
+
+
+@strawberry.type
+class LevelChange:
+    """A price level added, resized or removed; `size` is 0 for DELETE."""
+    side: BookSide
+    action: LevelAction
+    price: float
+    size: int
+
+
+@strawberry.type
+class OrderBookEvent:
+    """Snapshot (`snapshot: true`, bids/asks set) or incremental `changes`."""
+    symbol: str
+    sequence: int
+    snapshot: bool
+    bids: List[BookLevel]
+    asks: List[BookLevel]
+    changes: List[LevelChange]
+    timestamp: str
+
+
+@strawberry.type
+class StageLatency:
+    """Latency summary for one pipeline stage, in milliseconds."""
+    stage: str
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@strawberry.type
+class PublisherStats:
+    """Counters for the tick outbox feeding the Kafka sender."""
+    pending: int
+    enqueued: int
+    conflated: int
+    drained: int
+    dropped: int
+
+
 @strawberry.type
 class Query:
     @strawberry.field
@@ -72,9 +230,63 @@ class Query:
         """Simple liveness probe used by tests and orchestrators."""
         return "pong"
 
+    @strawberry.field
+    def latency(self, stages: Optional[List[str]] = None) -> List[StageLatency]:
+        """Per-stage latency histograms aggregated since process start.
+
+        - stages: optional filter; defaults to every stage observed so far,
+          in pipeline order followed by `total`.
+        """
+        order = [s for s in STAGES if s != "origin"] + [TOTAL_STAGE]
+        wanted = order if stages is None else [s for s in stages if s in order]
+        result: List[StageLatency] = []
+        for stage in wanted:
+            hist = LATENCY.histograms.get(stage)
+            if hist is None:
+                continue
+            result.append(
+                StageLatency(
+                    stage=stage,
+                    count=hist.count,
+                    mean_ms=hist.mean() / 1000,
+                    p50_ms=hist.percentile(0.5) / 1000,
+                    p90_ms=hist.percentile(0.9) / 1000,
+                    p99_ms=hist.percentile(0.99) / 1000,
+                    max_ms=hist.max_us / 1000,
+                )
+            )
+        return result
+
+    @strawberry.field
+    def publisher_stats(self) -> PublisherStats:
+        """Outbox depth, ticks conflated before sending, and drained ticks that were not published."""
+        return PublisherStats(
+            pending=len(PRICE_OUTBOX),
+            enqueued=PRICE_OUTBOX.enqueued,
+            conflated=PRICE_OUTBOX.conflated,
+            drained=PRICE_OUTBOX.drained,
+            dropped=PRICE_OUTBOX.dropped,
+        )
+
 
 DEFAULT_SYMBOLS: List[str] = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
 
+# Alert rules evaluated by the publisher on every generated tick.
+ALERTS = AlertEngine()
+
+# Indicators shared by every `indicators` subscriber, updated per tick.
+INDICATORS = IndicatorEngine()
+
+# Simulated Level-2 books stepped on every tick, and their unsent deltas.
+BOOKS = OrderBookSimulator()
+BOOK_OUTBOX: ConflatingOutbox[str, BookDelta] = ConflatingOutbox()
+
+# Max encoded prices the sender hands to one publish call.
+SENDER_BATCH_SIZE = 500
+
+# Latest unsent (payload, trace) per symbol, filled by the tick generator.
+PRICE_OUTBOX: ConflatingOutbox[str, tuple[bytes, TraceContext]] = ConflatingOutbox()
+
 
 def _initialize_prices(symbols: List[str]) -> dict[str, float]:
     """Create a deterministic initial price map for the provided symbols.
@@ -121,6 +333,43 @@ def _apply_ticks(last_prices: dict[str, float], symbols: List[str], update_set:
     return snapshot
 
 
+@strawberry.type
+class Mutation:
+    @strawberry.mutation
+    def create_alert(
+        self,
+        symbol: str,
+        above: Optional[float] = None,
+        below: Optional[float] = None,
+        percent_move: Optional[float] = None,
+    ) -> Alert:
+        """Register a one-shot alert; pass exactly one of above/below/percentMove.
+
+        - above/below: absolute price level to cross upwards/downwards
+        - percent_move: signed % move from the last observed price
+        - symbol must be one of the published symbols; the number of
+          active alerts is capped (ALERT_MAX_RULES)
+        """
+        given = [v for v in (above, below, percent_move) if v is not None]
+        if len(given) != 1:
+            raise ValueError("Pass exactly one of above, below or percentMove")
+        if symbol not in DEFAULT_SYMBOLS:
+            # Rules for symbols the publisher never ticks could never fire.
+            raise ValueError(f"Unknown symbol {symbol}")
+        if above is not None:
+            rule = ALERTS.add_rule(symbol, AlertDirection.ABOVE, above)
+        elif below is not None:
+            rule = ALERTS.add_rule(symbol, AlertDirection.BELOW, below)
+        else:
+            rule = ALERTS.add_percent_rule(symbol, percent_move)
+        return Alert.from_rule(rule)
+
+    @strawberry.mutation
+    def cancel_alert(self, id: int) -> bool:
+        """Remove an active alert; returns False if it already fired or is unknown."""
+        return ALERTS.cancel(id)
+
+
 @strawberry.type
 class Subscription:
     @strawberry.subscription
@@ -137,6 +386,8 @@ class Subscription:
         Behavior
         - Streams events from Kafka and yields one-price batches (one item per
           list) as messages arrive.
+        - Stamps consume/decode on the record's trace and hands it to the
+          WebSocket handler, which stamps execute/socket_write.
         - If a Kafka consumer cannot be started, raises an error indicating
           Kafka is unavailable.
         """
@@ -147,9 +398,15 @@ class Subscription:
         try:
             while True:
                 message = await consumer.getone()
+                trace = TraceContext.from_headers(message.headers)
+                if trace is not None:
+                    trace.stamp("consume")
                 data = decode_price(message.value)
                 if not data:
                     continue
+                if trace is not None:
+                    trace.stamp("decode")
+                    set_current_trace(trace)
                 yield [
                     Price(
                         symbol=str(data.get("symbol")),
@@ -162,45 +419,195 @@ class Subscription:
             await consumer.stop()
 
 
+    @strawberry.subscription
+    async def alerts(self, symbols: Optional[List[str]] = None) -> AsyncGenerator[AlertEvent, None]:
+        """Stream alert triggers as ticks cross rule thresholds.
+
+        - symbols: optional filter; defaults to alerts for every symbol
+        """
+        wanted = set(symbols) if symbols else None
+        queue = ALERTS.subscribe()
+        try:
+            while True:
+                trigger = await queue.get()
+                if wanted is None or trigger.rule.symbol in wanted:
+                    yield AlertEvent.from_trigger(trigger)
+        finally:
+            ALERTS.unsubscribe(queue)
+
+
+    @strawberry.subscription
+    async def indicators(
+        self,
+        symbols: List[str],
+        kinds: List[IndicatorKind],
+        period: int = 14,
+        band_width: float = 2.0,
+        interval_seconds: float = 1.0,
+    ) -> AsyncGenerator[List[IndicatorValue], None]:
+        """Emit the latest indicator values every `interval_seconds`.
+
+        - symbols/kinds: every combination is tracked
+        - period: window length (ticks) for all requested kinds, at most
+          MAX_PERIOD
+        - band_width: Bollinger standard-deviation multiplier
+
+        Indicators warm up over `period` ticks and are omitted until ready.
+        Instances are shared with other subscribers using the same params.
+        """
+        if interval_seconds <= 0:
+            raise ValueError("intervalSeconds must be positive")
+        if len(symbols) * len(kinds) > MAX_INDICATORS_PER_SUBSCRIPTION:
+            raise ValueError(f"At most {MAX_INDICATORS_PER_SUBSCRIPTION} symbol/kind combinations per subscription")
+        acquired = []
+        try:
+            for s in symbols:
+                for kind in kinds:
+                    acquired.append(INDICATORS.acquire(s, kind, period, band_width))
+            while True:
+                await asyncio.sleep(interval_seconds)
+                timestamp = datetime.utcnow().isoformat() + "Z"
+                yield [
+                    IndicatorValue(
+                        symbol=ind.symbol,
+                        kind=ind.kind,
+                        period=ind.period,
+                        value=ind.value,
+                        upper=ind.upper,
+                        lower=ind.lower,
+                        timestamp=timestamp,
+                    )
+                    for ind in acquired
+                    if ind.value is not None
+                ]
+        finally:
+            for ind in acquired:
+                INDICATORS.release(ind)
+
+    @strawberry.subscription
+    async def order_book(self, symbol: str, depth: int = 10) -> AsyncGenerator[OrderBookEvent, None]:
+        """Stream a top-`depth` book snapshot, then incremental level changes.
+
+        - Deltas come from the `orderbook` Kafka topic, keyed by symbol, and
+          are applied to a local copy; only changes visible within `depth`
+          are emitted.
+        - A sequence gap (e.g., deltas missed between snapshot and consumer
+          start) triggers a fresh snapshot event.
+        """
+        if depth <= 0:
+            raise ValueError("depth must be positive")
+        if BOOKS.get(symbol) is None:
+            raise ValueError(f"No order book for {symbol}")
+        consumer = await create_started_consumer(KAFKA_BOOK_TOPIC, group_id=None)
+        if consumer is None:
+            raise RuntimeError("Kafka not available: failed to start consumer")
+        key = symbol.encode("utf-8")
+        try:
+            local = LocalBook.from_simulated(BOOKS.get(symbol))
+            yield _book_snapshot_event(local, depth)
+            while True:
+                message = await consumer.getone()
+                if message.key != key:
+                    # Other symbols' deltas are skipped without parsing them.
+                    continue
+                delta = decode_book_delta(message.value)
+                if delta is None or delta.symbol != symbol:
+                    continue
+                before = local.top(depth)
+                if not local.apply(delta):
+                    local = LocalBook.from_simulated(BOOKS.get(symbol))
+                    yield _book_snapshot_event(local, depth)
+                    continue
+                changes = diff_views(before, local.top(depth))
+                if changes:
+                    yield OrderBookEvent(
+                        symbol=symbol,
+                        sequence=local.seq,
+                        snapshot=False,
+                        bids=[],
+                        asks=[],
+                        changes=[
+                            LevelChange(side=side, action=action, price=round(price * local.tick, 8), size=size)
+                            for side, action, price, size in changes
+                        ],
+                        timestamp=datetime.utcnow().isoformat() + "Z",
+                    )
+        finally:
+            await consumer.stop()
+
+
+def _book_snapshot_event(local: LocalBook, depth: int) -> OrderBookEvent:
+    bids, asks = local.top(depth)
+    return OrderBookEvent(
+        symbol=local.symbol,
+        sequence=local.seq,
+        snapshot=True,
+        bids=[BookLevel(price=round(p * local.tick, 8), size=sz) for p, sz in bids],
+        asks=[BookLevel(price=round(p * local.tick, 8), size=sz) for p, sz in asks],
+        changes=[],
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
 # Create the GraphQL schema with subscription and mount it on FastAPI
-schema = strawberry.Schema(query=Query, subscription=Subscription)
+schema = strawberry.Schema(query=Query, mutation=Mutation, subscription=Subscription)
 
 # Create FastAPI app and GraphQL route
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application startup/shutdown.
 
-    - On startup, when Kafka is enabled, start a background publisher task that
-      emits per-symbol price events to the `prices` topic.
-    - On shutdown, cancel and await the publisher task to exit cleanly.
+    - On startup, when Kafka is enabled, start the tick generator and the
+      sender tasks that emit per-symbol price events to the `prices` topic
+      and order-book deltas to the `orderbook` topic.
+    - On shutdown, cancel and await all tasks to exit cleanly.
+    - Always run the event-loop lag monitor.
     """
-    publisher_task: Optional[asyncio.Task] = None
+    LOOP_MONITOR.start()
+    tasks: list[asyncio.Task] = []
     if KAFKA_ENABLED:
-        publisher_task = asyncio.create_task(_publisher_loop(DEFAULT_SYMBOLS))
+        tasks.append(asyncio.create_task(_publisher_loop(DEFAULT_SYMBOLS, PRICE_OUTBOX, book_outbox=BOOK_OUTBOX)))
+        tasks.append(asyncio.create_task(_sender_loop(PRICE_OUTBOX)))
+        tasks.append(asyncio.create_task(_book_sender_loop(BOOK_OUTBOX)))
     try:
         yield
     finally:
-        if publisher_task is not None:
-            publisher_task.cancel()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
             try:
-                await publisher_task
-            except Exception:
+                await task
+            except (asyncio.CancelledError, Exception):
                 pass
+        await LOOP_MONITOR.stop()
 
 app = FastAPI(lifespan=lifespan)
-graphql_app = GraphQLRouter(schema)
+graphql_app = FastPathGraphQLRouter(schema)
 app.include_router(graphql_app, prefix="/graphql")
+app.include_router(create_admin_router())
 
 
 # ---------------- Startup Publisher (Kafka) ----------------
 
 
-async def _publisher_loop(symbols: List[str], interval_seconds: float = 1.0) -> None:
-    """Background task that generates ticks and publishes them to Kafka.
+async def _publisher_loop(
+    symbols: List[str],
+    outbox: ConflatingOutbox[str, tuple[bytes, TraceContext]],
+    interval_seconds: float = 1.0,
+    book_outbox: Optional[ConflatingOutbox[str, BookDelta]] = None,
+) -> None:
+    """Background task that generates ticks into the outbox.
 
-    Publishes individual price messages as they occur to keep the stream granular.
+    Each due symbol's price is encoded and stored as an individual message so
+    the stream stays granular. The loop only ever awaits its own schedule, so
+    Kafka stalls cannot shift `next_due`. Each message starts a trace whose
+    origin is stamped before the tick is generated. Order-book deltas are
+    merged into `book_outbox` when given.
     """
     last_prices = _initialize_prices(symbols)
+    for s, price in last_prices.items():
+        ALERTS.observe(s, price)
+        BOOKS.on_tick(s, price)
     pace_factor: dict[str, float] = {s: random.uniform(0.5, 1.5) for s in symbols}
     next_due: dict[str, float] = {
         s: time.monotonic() + interval_seconds * pace_factor[s] * random.uniform(0.8, 1.2)
@@ -213,15 +620,63 @@ async def _publisher_loop(symbols: List[str], interval_seconds: float = 1.0) ->
             sleep_time = max(0.01, min(next_due.values()) - now)
             await asyncio.sleep(min(sleep_time, 0.25))
             continue
-        # Publish each due symbol as an individual message
-        prices = _apply_ticks(last_prices, symbols, set(due_symbols))
+        # Queue each due symbol as an individual message
+        due_set = set(due_symbols)
+        origin_ns = time.time_ns()
+        prices = _apply_ticks(last_prices, symbols, due_set)
+        generated_ns = time.time_ns()
         for p in prices:
-            if p.symbol in due_symbols:
-                await publish_batch(KAFKA_PRICE_TOPIC, (encode_price(p) for _ in [0]))
+            if p.symbol in due_set:
+                trace = TraceContext.start(origin_ns)
+                trace.stamps["generate"] = generated_ns
+                value = encode_price(p)
+                trace.stamp("encode")
+                outbox.put(p.symbol, (value, trace))
+                ALERTS.on_tick(p.symbol, p.price)
+                INDICATORS.on_tick(p.symbol, p.price)
+                delta = BOOKS.on_tick(p.symbol, p.price)
+                if book_outbox is not None and delta is not None:
+                    book_outbox.put(p.symbol, delta, merge=merge_deltas)
         for s in due_symbols:
             next_due[s] = now + interval_seconds * pace_factor[s] * random.uniform(0.8, 1.2)
 
 
+async def _sender_loop(
+    outbox: ConflatingOutbox[str, tuple[bytes, TraceContext]],
+    batch_size: int = SENDER_BATCH_SIZE,
+) -> None:
+    """Background task that drains the outbox to Kafka in batches.
+
+    While a publish is in flight the generator keeps conflating into the
+    outbox, so the next drain carries only the latest price per symbol.
+    """
+    while True:
+        await outbox.wait()
+        batch = outbox.drain(batch_size)
+        sent = await publish_traced(KAFKA_PRICE_TOPIC, [item for _, item in batch])
+        if sent < len(batch):
+            # Conflation already keeps the newest tick per symbol pending, so
+            # a lost batch is superseded by the next tick rather than retried.
+            outbox.mark_dropped(len(batch) - sent)
+
+
+async def _book_sender_loop(
+    outbox: ConflatingOutbox[str, BookDelta],
+    batch_size: int = SENDER_BATCH_SIZE,
+) -> None:
+    """Background task that drains merged order-book deltas to Kafka."""
+    while True:
+        await outbox.wait()
+        batch = outbox.drain(batch_size)
+        sent = await publish_keyed_batch(
+            KAFKA_BOOK_TOPIC,
+            [(symbol.encode("utf-8"), encode_book_delta(delta)) for symbol, delta in batch],
+        )
+        if sent < len(batch):
+            # Subscribers see the sequence gap and re-snapshot.
+            outbox.mark_dropped(len(batch) - sent)
+
+
 
 
 if __name__ == "__main__":
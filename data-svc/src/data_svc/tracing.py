@@ -0,0 +1,250 @@
+"""
+End-to-end latency tracing for data-svc.
+
+Every published price event carries a trace id and a set of high-resolution
+stage stamps in Kafka headers. Each hop appends its own stamp and records the
+time spent since the previous stamp into a per-stage latency histogram, so a
+p99 regression can be attributed to a single hop.
+
+Stages (in pipeline order)
+- origin: tick generation starts (the trace's reference point)
+- generate: the Price object exists
+- encode: the JSON payload is ready to hand to the producer
+- produce_ack: the broker acknowledged the send (producer-side only)
+- consume: a subscription's consumer received the record
+- decode: the payload was decoded into a dict
+- execute: GraphQL resolved the result and is about to write the frame
+- socket_write: the `next` frame was written to the WebSocket
+
+A stage's latency is measured from the most recent earlier stamp present on
+the trace. Because `produce_ack` is stamped after the record left the
+process, consumers see `consume` measured from `encode` (i.e., it includes
+the broker round trip). The synthetic `total` stage covers origin to
+socket write.
+
+Header layout
+- trace-id: hex trace identifier
+- ts-<stage>: wall-clock nanoseconds (`time.time_ns()`), ASCII-encoded
+
+Wall-clock nanoseconds are used (rather than a monotonic clock) so stamps
+remain comparable across processes that share a host clock.
+"""
+
+import bisect
+import math
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from strawberry.fastapi import GraphQLRouter
+from strawberry.subscriptions.protocols.graphql_transport_ws.handlers import (
+    BaseGraphQLTransportWSHandler,
+)
+
+
+STAGES: tuple[str, ...] = (
+    "origin",
+    "generate",
+    "encode",
+    "produce_ack",
+    "consume",
+    "decode",
+    "execute",
+    "socket_write",
+)
+TOTAL_STAGE = "total"
+
+TRACE_ID_HEADER = "trace-id"
+STAMP_HEADER_PREFIX = "ts-"
+
+
+@dataclass
+class TraceContext:
+    """Trace id plus the nanosecond stamps collected so far for one event."""
+
+    trace_id: str
+    stamps: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def start(cls, origin_ns: Optional[int] = None) -> "TraceContext":
+        """Begin a new trace, stamping `origin` now unless a value is given."""
+        trace = cls(trace_id=uuid.uuid4().hex)
+        trace.stamps["origin"] = time.time_ns() if origin_ns is None else origin_ns
+        return trace
+
+    def stamp(self, stage: str) -> int:
+        """Record the current wall-clock time for `stage` and return it."""
+        now = time.time_ns()
+        self.stamps[stage] = now
+        return now
+
+    def to_headers(self) -> list[tuple[str, bytes]]:
+        """Serialize into Kafka headers (list of (key, bytes) pairs)."""
+        headers = [(TRACE_ID_HEADER, self.trace_id.encode("ascii"))]
+        for stage, ns in self.stamps.items():
+            headers.append((STAMP_HEADER_PREFIX + stage, str(ns).encode("ascii")))
+        return headers
+
+    @classmethod
+    def from_headers(cls, headers: Optional[Iterable[tuple[str, bytes]]]) -> Optional["TraceContext"]:
+        """Rebuild a trace from Kafka headers; None when no trace id is present."""
+        trace_id: Optional[str] = None
+        stamps: dict[str, int] = {}
+        for key, value in headers or ():
+            try:
+                if key == TRACE_ID_HEADER:
+                    trace_id = value.decode("ascii")
+                elif key.startswith(STAMP_HEADER_PREFIX):
+                    stamps[key[len(STAMP_HEADER_PREFIX):]] = int(value)
+            except (UnicodeDecodeError, ValueError):
+                continue
+        if trace_id is None:
+            return None
+        return cls(trace_id=trace_id, stamps=stamps)
+
+
+# Bucket upper bounds in microseconds: 1us .. ~67s on a log2 scale.
+_BUCKET_BOUNDS_US: list[int] = [1 << i for i in range(27)]
+
+
+class LatencyHistogram:
+    """Fixed log2-bucket histogram of latencies in microseconds.
+
+    Recording is O(log buckets) with constant memory; percentiles are
+    reported as the upper bound of the bucket containing the rank, which is
+    at most 2x pessimistic and stable enough to compare p99s across runs.
+    """
+
+    __slots__ = ("counts", "count", "total_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * (len(_BUCKET_BOUNDS_US) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, duration_us: int) -> None:
+        duration_us = max(0, duration_us)
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS_US, duration_us)] += 1
+        self.count += 1
+        self.total_us += duration_us
+        if duration_us > self.max_us:
+            self.max_us = duration_us
+
+    def percentile(self, q: float) -> int:
+        """Return the bucket upper bound (us) at quantile `q` in [0, 1]."""
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                if i < len(_BUCKET_BOUNDS_US):
+                    return min(_BUCKET_BOUNDS_US[i], self.max_us)
+                return self.max_us
+        return self.max_us
+
+    def mean(self) -> float:
+        return self.total_us / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """Per-stage latency histograms aggregated over every traced event."""
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def record(self, stage: str, duration_ns: int) -> None:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = LatencyHistogram()
+        hist.record(duration_ns // 1000)
+
+    def record_trace(self, trace: TraceContext, stages: Iterable[str]) -> None:
+        """Record `stages` of `trace`, each measured from the prior present stamp."""
+        wanted = set(stages)
+        prev: Optional[int] = None
+        for stage in STAGES:
+            ns = trace.stamps.get(stage)
+            if ns is None:
+                continue
+            if prev is not None and stage in wanted:
+                self.record(stage, ns - prev)
+            # produce_ack is stamped after the record was sent; later stages
+            # are measured from encode, the last stamp the consumer saw.
+            if stage != "produce_ack":
+                prev = ns
+        if TOTAL_STAGE in wanted and "origin" in trace.stamps and "socket_write" in trace.stamps:
+            self.record(TOTAL_STAGE, trace.stamps["socket_write"] - trace.stamps["origin"])
+
+    def reset(self) -> None:
+        self.histograms.clear()
+
+
+# Process-wide recorder queried by the GraphQL `latency` field.
+LATENCY = LatencyRecorder()
+
+PRODUCER_STAGES: tuple[str, ...] = ("generate", "encode", "produce_ack")
+CONSUMER_STAGES: tuple[str, ...] = ("consume", "decode", "execute", "socket_write", TOTAL_STAGE)
+
+class _TraceSlot:
+    """Mutable holder for the trace of the event being delivered."""
+
+    __slots__ = ("trace",)
+
+    def __init__(self) -> None:
+        self.trace: Optional[TraceContext] = None
+
+
+# One slot per subscription operation. The handler installs it before the
+# operation task is spawned; graphql-core iterates the subscription generator
+# in child tasks with copied contexts, so a plain ContextVar value set there
+# would not be visible to the handler, but mutations of the shared slot are.
+_trace_slot: ContextVar[Optional[_TraceSlot]] = ContextVar("trace_slot", default=None)
+
+
+def open_trace_slot() -> None:
+    """Give the operation task about to be spawned its own trace slot."""
+    _trace_slot.set(_TraceSlot())
+
+
+def set_current_trace(trace: TraceContext) -> None:
+    """Hand `trace` to the WebSocket handler that will write the next frame."""
+    slot = _trace_slot.get()
+    if slot is not None:
+        slot.trace = trace
+
+
+def _take_current_trace() -> Optional[TraceContext]:
+    slot = _trace_slot.get()
+    if slot is None or slot.trace is None:
+        return None
+    trace, slot.trace = slot.trace, None
+    return trace
+
+
+class TracingGraphQLTransportWSHandler(BaseGraphQLTransportWSHandler):
+    """graphql-transport-ws handler that stamps execute/socket_write stages."""
+
+    async def handle_subscribe(self, message) -> None:
+        open_trace_slot()
+        await super().handle_subscribe(message)
+
+    async def send_message(self, message) -> None:
+        trace = _take_current_trace() if message.get("type") == "next" else None
+        if trace is None:
+            await super().send_message(message)
+            return
+        trace.stamp("execute")
+        await super().send_message(message)
+        trace.stamp("socket_write")
+        LATENCY.record_trace(trace, CONSUMER_STAGES)
+
+
+class TracingGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter whose WebSocket transport records delivery latencies."""
+
+    graphql_transport_ws_handler_class = TracingGraphQLTransportWSHandler
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from data_svc import fastpath, server
+
+
+class FakeConsumer:
+    """Stand-in for AIOKafkaConsumer that replays pre-built records."""
+
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    def feed(self, *records):
+        self._records.extend(records)
+
+    async def getone(self):
+        if self._records:
+            return self._records.pop(0)
+        await asyncio.sleep(3600)
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_consumer(monkeypatch):
+    """Serve every consumer the server or fast path starts from one FakeConsumer."""
+    consumer = FakeConsumer()
+
+    async def create_started_consumer(topic, group_id=None):
+        return consumer
+
+    monkeypatch.setattr(server, "create_started_consumer", create_started_consumer)
+    monkeypatch.setattr(fastpath, "create_started_consumer", create_started_consumer)
+    return consumer
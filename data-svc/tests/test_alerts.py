@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from data_svc import server
+from data_svc.alerts import AlertDirection, AlertEngine
+
+
+def test_only_crossed_thresholds_fire_once():
+    engine = AlertEngine()
+    engine.observe("AAPL", 100.0)
+    up = engine.add_rule("AAPL", AlertDirection.ABOVE, 101.0)
+    far = engine.add_rule("AAPL", AlertDirection.ABOVE, 110.0)
+    down = engine.add_rule("AAPL", AlertDirection.BELOW, 99.0)
+    engine.add_rule("MSFT", AlertDirection.ABOVE, 1.0)
+
+    fired = engine.on_tick("AAPL", 101.0)
+    assert [t.rule.id for t in fired] == [up.id]
+    assert fired[0].previous_price == 100.0
+    # already removed: moving back and forth does not re-fire
+    assert engine.on_tick("AAPL", 100.5) == []
+    assert engine.on_tick("AAPL", 101.5) == []
+
+    fired = engine.on_tick("AAPL", 98.0)
+    assert [t.rule.id for t in fired] == [down.id]
+    assert engine.get(far.id) is not None
+    assert len(engine) == 2
+
+
+def test_percent_rule_and_cancel():
+    engine = AlertEngine()
+    with pytest.raises(ValueError):
+        engine.add_percent_rule("AAPL", 5)
+
+    engine.observe("AAPL", 200.0)
+    rule = engine.add_percent_rule("AAPL", -5)
+    assert rule.direction is AlertDirection.BELOW
+    assert rule.threshold == pytest.approx(190.0)
+
+    assert engine.cancel(rule.id)
+    assert not engine.cancel(rule.id)
+    assert engine.on_tick("AAPL", 150.0) == []
+
+
+def test_tick_fires_only_the_crossed_slice_of_many_rules():
+    # Default limits must admit the 100k+ active rules the engine targets
+    engine = AlertEngine()
+    engine.observe("AAPL", 100.0)
+    for i in range(100_000):
+        engine.add_rule("AAPL", AlertDirection.ABOVE, 200.0 + i * 0.001)
+    assert engine.on_tick("AAPL", 100.5) == []
+    assert len(engine.on_tick("AAPL", 200.0105)) == 11
+
+
+def test_active_rule_cap():
+    engine = AlertEngine(max_rules=2)
+    first = engine.add_rule("AAPL", AlertDirection.ABOVE, 101.0)
+    engine.add_rule("AAPL", AlertDirection.BELOW, 99.0)
+    with pytest.raises(ValueError, match="max 2"):
+        engine.add_rule("AAPL", AlertDirection.ABOVE, 102.0)
+
+    engine.cancel(first.id)
+    engine.add_rule("AAPL", AlertDirection.ABOVE, 102.0)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_triggers():
+    engine = AlertEngine()
+    queue = engine.subscribe()
+    engine.observe("AAPL", 100.0)
+    rule = engine.add_rule("AAPL", AlertDirection.ABOVE, 100.5)
+    engine.on_tick("AAPL", 101.0)
+
+    trigger = await asyncio.wait_for(queue.get(), timeout=1)
+    assert trigger.rule.id == rule.id
+    engine.unsubscribe(queue)
+
+
+@pytest.mark.asyncio
+async def test_create_alert_mutation(monkeypatch):
+    monkeypatch.setattr(server, "ALERTS", AlertEngine())
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        resp = await client.post("/graphql", json={
+            "query": 'mutation { createAlert(symbol: "AAPL", above: 250.5) { id symbol direction threshold } }'
+        })
+        alert = resp.json()["data"]["createAlert"]
+        assert alert["symbol"] == "AAPL"
+        assert alert["direction"] == "ABOVE"
+        assert alert["threshold"] == 250.5
+
+        resp = await client.post("/graphql", json={
+            "query": 'mutation { createAlert(symbol: "AAPL", above: 1, below: 2) { id } }'
+        })
+        assert "exactly one" in str(resp.json()["errors"])
+
+        resp = await client.post("/graphql", json={
+            "query": "mutation($id: Int!) { cancelAlert(id: $id) }",
+            "variables": {"id": alert["id"]},
+        })
+        assert resp.json()["data"]["cancelAlert"] is True
+
+
+@pytest.mark.asyncio
+async def test_create_alert_rejects_untracked_symbol(monkeypatch):
+    monkeypatch.setattr(server, "ALERTS", AlertEngine())
+    result = await server.schema.execute('mutation { createAlert(symbol: "NOPE", above: 1.0) { id } }')
+    assert result.errors[0].message == "Unknown symbol NOPE"
+    assert len(server.ALERTS) == 0
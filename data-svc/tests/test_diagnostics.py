@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from data_svc.diagnostics import LoopLagMonitor, profile_loop
+from data_svc.server import app
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag_and_logs_blocking_stack(caplog):
+    monitor = LoopLagMonitor(interval=0.01, slow_threshold=0.05)
+    with caplog.at_level(logging.WARNING, logger="data_svc.diagnostics"):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # block the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] > 0
+    assert snapshot["max_ms"] >= 100
+    assert monitor.stalls == 1
+    assert "test_monitor_records_lag_and_logs_blocking_stack" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_profile_loop_returns_collapsed_stacks():
+    def blocking_work():
+        end = time.monotonic() + 0.15
+        while time.monotonic() < end:
+            sum(range(1000))
+
+    async def busy():
+        await asyncio.sleep(0.02)
+        blocking_work()
+
+    profiled, _ = await asyncio.gather(profile_loop(0.2, 0.005), busy())
+
+    lines = profiled.strip().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert ";" in stack
+    assert any("busy" in line and "blocking_work" in line for line in lines)
+
+
+def test_admin_routes():
+    with TestClient(app) as client:
+        lag = client.get("/admin/loop-lag")
+        assert lag.status_code == 200
+        assert {"samples", "p99_ms", "max_ms", "stalls"} <= lag.json().keys()
+
+        resp = client.get("/admin/profile", params={"seconds": 0.05, "interval_ms": 5})
+        assert resp.status_code == 200
+        assert "profile.collapsed" in resp.headers["content-disposition"]
+
+        assert client.get("/admin/profile", params={"seconds": 600}).status_code == 422
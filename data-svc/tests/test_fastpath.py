@@ -0,0 +1,122 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from starlette.testclient import TestClient
+
+from data_svc import fastpath, server
+from data_svc.fastpath import compile_prices_plan
+from data_svc.kafka_utils import encode_price
+from data_svc.tracing import LATENCY, TraceContext
+
+
+def _record(symbol="AAPL", price=101.5, change=0.42):
+    p = server.Price(symbol=symbol, price=price, change_percent=change, timestamp="2025-01-01T00:00:00Z")
+    trace = TraceContext.start()
+    trace.stamp("encode")
+    return SimpleNamespace(value=encode_price(p), headers=trace.to_headers())
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "subscription { prices { symbol price changePercent timestamp } }",
+        "subscription S($s: [String!]) { prices(symbols: $s) { price symbol } }",
+        "subscription { ticks: prices { px: price __typename } }",
+    ],
+)
+def test_simple_selections_compile(query):
+    assert compile_prices_plan(server.schema, query, {"s": ["AAPL"]}, None) is not None
+
+
+@pytest.mark.parametrize(
+    "query, variables",
+    [
+        ("subscription { prices { ...P } } fragment P on Price { symbol }", None),
+        ("subscription { prices { symbol @include(if: true) } }", None),
+        ("subscription { prices { nope } }", None),
+        ("subscription S($s: [String!]) { prices(symbols: $s) { symbol } }", {"s": 5}),
+        ("query { ping }", None),
+        ("subscription {", None),
+    ],
+)
+def test_other_documents_fall_back(query, variables):
+    assert compile_prices_plan(server.schema, query, variables, None) is None
+
+
+def test_only_canonical_full_selection_uses_raw_bytes():
+    full = compile_prices_plan(server.schema, "subscription { prices { symbol price changePercent timestamp } }", None, None)
+    reordered = compile_prices_plan(server.schema, "subscription { prices { price symbol changePercent timestamp } }", None, None)
+    assert full.raw
+    assert not reordered.raw
+
+
+def test_rendered_frames_match_regular_execution_shape():
+    record = _record()
+    for query in (
+        "subscription { prices { symbol price changePercent timestamp } }",
+        "subscription { ticks: prices { px: price sym: symbol __typename } }",
+    ):
+        plan = compile_prices_plan(server.schema, query, None, None)
+        head, tail = plan.frame_affixes("7")
+        frame = json.loads(head + plan.render(record.value) + tail)
+        assert frame["id"] == "7" and frame["type"] == "next"
+
+    assert json.loads(head + plan.render(record.value) + tail)["payload"]["data"] == {
+        "ticks": [{"px": 101.5, "sym": "AAPL", "__typename": "Price"}]
+    }
+    assert plan.render(b"not json") is None
+
+
+def test_fast_path_streams_frames_over_websocket(fake_consumer):
+    LATENCY.reset()
+    fake_consumer.feed(_record("AAPL"), _record("MSFT", 55.0, -1.0))
+
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/graphql", subprotocols=["graphql-transport-ws"]) as websocket:
+            websocket.send_json({"type": "connection_init", "payload": {}})
+            assert websocket.receive_json()["type"] == "connection_ack"
+            websocket.send_json({
+                "id": "1",
+                "type": "subscribe",
+                "payload": {"query": "subscription { prices { symbol price changePercent timestamp } }"},
+            })
+            first = websocket.receive_json()
+            second = websocket.receive_json()
+            websocket.send_json({"id": "1", "type": "complete"})
+
+    assert first == {
+        "id": "1",
+        "type": "next",
+        "payload": {"data": {"prices": [{
+            "symbol": "AAPL",
+            "price": 101.5,
+            "changePercent": 0.42,
+            "timestamp": "2025-01-01T00:00:00Z",
+        }]}},
+    }
+    assert second["payload"]["data"]["prices"][0]["symbol"] == "MSFT"
+    assert LATENCY.histograms["socket_write"].count == 2
+
+
+def test_fast_path_reports_consumer_start_failure(monkeypatch):
+    async def broken_consumer(topic, group_id=None):
+        raise RuntimeError("broker down")
+
+    monkeypatch.setattr(fastpath, "create_started_consumer", broken_consumer)
+    monkeypatch.setattr(server, "create_started_consumer", broken_consumer)
+
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/graphql", subprotocols=["graphql-transport-ws"]) as websocket:
+            websocket.send_json({"type": "connection_init", "payload": {}})
+            assert websocket.receive_json()["type"] == "connection_ack"
+            websocket.send_json({
+                "id": "1",
+                "type": "subscribe",
+                "payload": {"query": "subscription { prices { symbol price } }"},
+            })
+            frame = websocket.receive_json()
+
+    # Same error frame as the regular path
+    assert frame["id"] == "1"
+    assert frame["payload"]["errors"][0]["message"] == "broker down"
@@ -0,0 +1,145 @@
+import asyncio
+import random
+import statistics
+
+import pytest
+
+from data_svc import server
+from data_svc.indicators import Indicator, IndicatorEngine, IndicatorKind, create_indicator
+
+
+def _walk(n=200, seed=3):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] * (1 + rng.uniform(-0.01, 0.01)))
+    return prices
+
+
+def _feed(kind, prices, period, **kwargs):
+    indicator = create_indicator("AAPL", kind, period, **kwargs)
+    for p in prices:
+        indicator.update(p, 1.0)
+    return indicator
+
+
+def test_ema_matches_recursive_definition():
+    prices = _walk()
+    period = 10
+    expected = sum(prices[:period]) / period
+    alpha = 2 / (period + 1)
+    for p in prices[period:]:
+        expected = alpha * p + (1 - alpha) * expected
+    assert _feed(IndicatorKind.EMA, prices, period).value == pytest.approx(expected)
+    assert _feed(IndicatorKind.EMA, prices[: period - 1], period).value is None
+
+
+def test_rolling_vwap_and_bollinger_match_window_recompute():
+    prices = _walk()
+    period = 20
+    window = prices[-period:]
+
+    vwap = _feed(IndicatorKind.VWAP, prices, period)
+    assert vwap.value == pytest.approx(sum(window) / period)
+
+    bands = _feed(IndicatorKind.BOLLINGER, prices, period, width=2.0)
+    mean = statistics.fmean(window)
+    std = statistics.pstdev(window)
+    assert bands.value == pytest.approx(mean)
+    assert bands.upper == pytest.approx(mean + 2 * std)
+    assert bands.lower == pytest.approx(mean - 2 * std)
+
+
+def test_rsi_wilder_smoothing():
+    prices = _walk()
+    period = 14
+    changes = [b - a for a, b in zip(prices, prices[1:])]
+    gain = sum(max(c, 0) for c in changes[:period]) / period
+    loss = sum(max(-c, 0) for c in changes[:period]) / period
+    for c in changes[period:]:
+        gain = (gain * (period - 1) + max(c, 0)) / period
+        loss = (loss * (period - 1) + max(-c, 0)) / period
+    expected = 100 - 100 / (1 + gain / loss)
+    assert _feed(IndicatorKind.RSI, prices, period).value == pytest.approx(expected)
+    assert _feed(IndicatorKind.RSI, [1.0, 2.0, 3.0], 2).value == 100.0
+
+
+def test_indicator_without_update_fails_at_construction():
+    class Incomplete(Indicator):
+        kind = IndicatorKind.EMA
+
+    with pytest.raises(TypeError):
+        Incomplete("AAPL", 3)
+
+
+def test_engine_shares_instances_and_releases_them():
+    engine = IndicatorEngine()
+    a = engine.acquire("AAPL", IndicatorKind.EMA, 5)
+    b = engine.acquire("AAPL", IndicatorKind.EMA, 5)
+    c = engine.acquire("AAPL", IndicatorKind.EMA, 6)
+    assert a is b and a is not c
+    assert len(engine) == 2
+
+    for p in range(1, 7):
+        engine.on_tick("AAPL", float(p))
+    assert a.value is not None and c.value is not None
+
+    engine.release(a)
+    assert len(engine) == 2
+    engine.release(b)
+    engine.release(c)
+    assert len(engine) == 0
+    engine.on_tick("AAPL", 1.0)  # no subscribers: no-op
+
+    with pytest.raises(ValueError):
+        engine.acquire("AAPL", IndicatorKind.BOLLINGER, 1)
+    with pytest.raises(ValueError, match="<= 1000"):
+        engine.acquire("AAPL", IndicatorKind.VWAP, 100_000_000)
+    assert len(engine) == 0
+
+
+@pytest.mark.asyncio
+async def test_indicators_subscription_emits_ready_values(monkeypatch):
+    engine = IndicatorEngine()
+    monkeypatch.setattr(server, "INDICATORS", engine)
+    query = """
+    subscription {
+      indicators(symbols: ["AAPL"], kinds: [EMA, BOLLINGER], period: 3, intervalSeconds: 0.01) {
+        symbol kind period value upper lower
+      }
+    }
+    """
+    stream = await server.schema.subscribe(query)
+
+    async def feed():
+        await asyncio.sleep(0)
+        for p in (10.0, 11.0, 12.0):
+            engine.on_tick("AAPL", p)
+
+    first, _ = await asyncio.gather(stream.__anext__(), feed())
+    assert first.errors is None
+    rows = {r["kind"]: r for r in first.data["indicators"]}
+    assert rows["EMA"]["value"] == pytest.approx(11.0)
+    assert rows["BOLLINGER"]["upper"] > 11.0 > rows["BOLLINGER"]["lower"]
+    assert len(engine) == 2
+
+    await stream.aclose()
+    assert len(engine) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "args",
+    [
+        'symbols: ["AAPL", "MSFT"], kinds: [EMA, VWAP], period: 100000000',
+        "symbols: [%s], kinds: [EMA, VWAP, BOLLINGER, RSI]" % ", ".join(f'"S{i}"' for i in range(26)),
+    ],
+)
+async def test_indicators_subscription_rejects_oversized_requests(monkeypatch, args):
+    engine = IndicatorEngine()
+    monkeypatch.setattr(server, "INDICATORS", engine)
+    stream = await server.schema.subscribe("subscription { indicators(%s) { value } }" % args)
+
+    result = await stream.__anext__()
+    assert result.errors
+    assert len(engine) == 0
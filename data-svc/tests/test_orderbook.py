@@ -0,0 +1,134 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from data_svc import server
+from data_svc.kafka_utils import decode_book_delta, encode_book_delta
+from data_svc.orderbook import LocalBook, OrderBookSimulator, merge_deltas
+
+
+def _walk(sim, symbol, n, seed=5):
+    rng = random.Random(seed)
+    price = 150.0
+    deltas = []
+    for _ in range(n):
+        price = max(1.0, round(price * (1 + rng.uniform(-0.002, 0.002)), 2))
+        deltas.append(sim.on_tick(symbol, price))
+    return deltas
+
+
+def test_ladders_stay_contiguous_and_fixed_size():
+    sim = OrderBookSimulator(levels=5)
+    sim.on_tick("AAPL", 150.0)
+    _walk(sim, "AAPL", 200)
+    bids, asks = sim.get("AAPL").snapshot()
+    assert len(bids) == len(asks) == 5
+    assert [p for p, _ in bids] == list(range(bids[0][0], bids[0][0] - 5, -1))
+    assert [p for p, _ in asks] == list(range(asks[0][0], asks[0][0] + 5))
+    assert bids[0][0] < asks[0][0]
+
+
+def test_deltas_rebuild_the_simulated_book():
+    sim = OrderBookSimulator(levels=8)
+    sim.on_tick("AAPL", 150.0)
+    local = LocalBook.from_simulated(sim.get("AAPL"))
+    for delta in _walk(sim, "AAPL", 300):
+        wire = decode_book_delta(encode_book_delta(delta))
+        assert local.apply(wire)
+    assert local.top(8) == sim.get("AAPL").snapshot()
+    assert local.seq == sim.get("AAPL").seq
+
+
+def test_merged_deltas_are_equivalent_to_applying_each():
+    sim = OrderBookSimulator(levels=6)
+    sim.on_tick("AAPL", 150.0)
+    local = LocalBook.from_simulated(sim.get("AAPL"))
+    deltas = _walk(sim, "AAPL", 100)
+
+    merged = deltas[0]
+    for delta in deltas[1:]:
+        merged = merge_deltas(merged, delta)
+
+    assert local.apply(merged)
+    assert local.top(6) == sim.get("AAPL").snapshot()
+
+
+def test_snapshot_inside_a_merged_range_converges():
+    diverged = 0
+    for seed in range(50):
+        sim = OrderBookSimulator(levels=5, seed=seed)
+        sim.on_tick("AAPL", 150.0)
+        deltas = _walk(sim, "AAPL", 3, seed=seed)
+        # Subscriber snapshots while these deltas are still unsent
+        local = LocalBook.from_simulated(sim.get("AAPL"))
+        deltas += _walk(sim, "AAPL", 3, seed=seed + 1000)
+
+        merged = deltas[0]
+        for delta in deltas[1:]:
+            merged = merge_deltas(merged, delta)
+        assert merged.prev_seq < local.seq < merged.seq
+        assert local.apply(merged)
+        diverged += local.top(5) != sim.get("AAPL").snapshot()
+    assert diverged == 0
+
+
+def test_sequence_gap_is_detected():
+    sim = OrderBookSimulator(levels=4)
+    sim.on_tick("AAPL", 150.0)
+    local = LocalBook.from_simulated(sim.get("AAPL"))
+    sim.on_tick("AAPL", 150.5)
+    skipped_ahead = sim.on_tick("AAPL", 151.0)
+    assert not local.apply(skipped_ahead)
+    assert decode_book_delta(b"garbage") is None
+
+
+def test_order_book_subscription_streams_snapshot_then_changes(monkeypatch, fake_consumer):
+    sim = OrderBookSimulator(levels=5)
+    sim.on_tick("AAPL", 150.0)
+    sim.on_tick("MSFT", 300.0)
+    monkeypatch.setattr(server, "BOOKS", sim)
+    decoded = []
+
+    def counting_decode(value):
+        decoded.append(value)
+        return decode_book_delta(value)
+
+    monkeypatch.setattr(server, "decode_book_delta", counting_decode)
+
+    async def run():
+        stream = await server.schema.subscribe(
+            'subscription { orderBook(symbol: "AAPL", depth: 3) { '
+            "sequence snapshot bids { price size } asks { price size } "
+            "changes { side action price size } } }"
+        )
+        first = await stream.__anext__()
+        other = sim.on_tick("MSFT", 301.0)
+        # A move of several ticks shifts every visible level
+        delta = sim.on_tick("AAPL", 150.5)
+        fake_consumer.feed(
+            SimpleNamespace(key=b"MSFT", value=encode_book_delta(other), headers=None),
+            SimpleNamespace(key=b"AAPL", value=encode_book_delta(delta), headers=None),
+        )
+        second = await stream.__anext__()
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.errors is None and second.errors is None
+    snap = first.data["orderBook"]
+    assert snap["snapshot"] is True
+    assert snap["sequence"] == 0
+    assert len(snap["bids"]) == len(snap["asks"]) == 3
+    assert snap["bids"][0]["price"] > snap["bids"][1]["price"]
+    assert snap["asks"][0]["price"] > snap["bids"][0]["price"]
+
+    update = second.data["orderBook"]
+    assert update["snapshot"] is False
+    assert update["sequence"] == 1
+    actions = {c["action"] for c in update["changes"]}
+    assert {"ADD", "DELETE"} <= actions
+    # Only levels within the requested depth are reported
+    added = [c for c in update["changes"] if c["action"] == "ADD"]
+    assert len([c for c in added if c["side"] == "BID"]) <= 3
+    # The MSFT record was filtered on its key without being decoded
+    assert len(decoded) == 1
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from data_svc import server
+from data_svc.outbox import ConflatingOutbox
+from data_svc.tracing import TraceContext
+
+
+def test_outbox_keeps_latest_value_per_key():
+    outbox = ConflatingOutbox()
+    outbox.put("AAPL", 1)
+    outbox.put("MSFT", 2)
+    outbox.put("AAPL", 3)
+
+    assert len(outbox) == 2
+    assert outbox.conflated == 1
+    # replaced keys keep their original position
+    assert outbox.drain() == [("AAPL", 3), ("MSFT", 2)]
+    assert len(outbox) == 0
+    assert outbox.drained == 2
+
+
+def test_outbox_drain_respects_batch_size():
+    outbox = ConflatingOutbox()
+    for i in range(5):
+        outbox.put(i, i)
+
+    assert outbox.drain(2) == [(0, 0), (1, 1)]
+    assert len(outbox) == 3
+    assert outbox.drain(10) == [(2, 2), (3, 3), (4, 4)]
+
+
+@pytest.mark.asyncio
+async def test_outbox_wait_wakes_on_put():
+    outbox = ConflatingOutbox()
+    waiter = asyncio.create_task(outbox.wait())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    outbox.put("AAPL", 1)
+    await asyncio.wait_for(waiter, timeout=1)
+    outbox.drain()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(outbox.wait(), timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_publisher_loop_conflates_without_a_sender():
+    outbox = ConflatingOutbox()
+    task = asyncio.create_task(server._publisher_loop(["AAPL", "MSFT"], outbox, interval_seconds=0.01))
+    await asyncio.sleep(0.3)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # nothing drains, so pending stays bounded by the symbol count
+    assert len(outbox) == 2
+    assert outbox.conflated > 0
+    assert outbox.enqueued == outbox.conflated + 2
+
+
+@pytest.mark.asyncio
+async def test_sender_counts_unpublished_batch_as_dropped(monkeypatch):
+    # Kafka is disabled in tests, so the producer is unavailable
+    outbox = ConflatingOutbox()
+    monkeypatch.setattr(server, "PRICE_OUTBOX", outbox)
+    outbox.put("AAPL", (b"{}", TraceContext.start()))
+    outbox.put("MSFT", (b"{}", TraceContext.start()))
+    task = asyncio.create_task(server._sender_loop(outbox))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert outbox.drained == 2
+    assert outbox.dropped == 2
+    result = await server.schema.execute("{ publisherStats { drained dropped } }")
+    assert result.data == {"publisherStats": {"drained": 2, "dropped": 2}}
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.testclient import TestClient
+
+from data_svc import server
+from data_svc.kafka_utils import encode_price
+from data_svc.tracing import LATENCY, LatencyHistogram, TraceContext
+
+
+def test_trace_headers_round_trip():
+    trace = TraceContext.start(origin_ns=1_000)
+    trace.stamps["generate"] = 2_000
+    trace.stamps["encode"] = 3_500
+
+    restored = TraceContext.from_headers(trace.to_headers())
+
+    assert restored is not None
+    assert restored.trace_id == trace.trace_id
+    assert restored.stamps == {"origin": 1_000, "generate": 2_000, "encode": 3_500}
+    assert TraceContext.from_headers([("other", b"x")]) is None
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    hist = LatencyHistogram()
+    for _ in range(99):
+        hist.record(3)
+    hist.record(5_000)
+
+    assert hist.count == 100
+    assert hist.percentile(0.5) == 4
+    assert hist.percentile(0.99) == 4
+    assert hist.percentile(1.0) == 5_000
+    assert hist.max_us == 5_000
+
+
+def test_record_trace_measures_consume_from_encode():
+    LATENCY.reset()
+    trace = TraceContext(trace_id="t", stamps={
+        "origin": 0,
+        "generate": 1_000_000,
+        "encode": 2_000_000,
+        "consume": 7_000_000,
+        "decode": 8_000_000,
+    })
+
+    LATENCY.record_trace(trace, ("generate", "encode", "consume", "decode"))
+
+    assert LATENCY.histograms["generate"].max_us == 1_000
+    assert LATENCY.histograms["encode"].max_us == 1_000
+    assert LATENCY.histograms["consume"].max_us == 5_000
+    assert LATENCY.histograms["decode"].max_us == 1_000
+
+
+def test_subscription_records_delivery_stages(fake_consumer):
+    LATENCY.reset()
+    price = server.Price(symbol="AAPL", price=101.5, change_percent=0.4, timestamp="t")
+    trace = TraceContext.start()
+    trace.stamp("generate")
+    trace.stamp("encode")
+    fake_consumer.feed(SimpleNamespace(value=encode_price(price), headers=trace.to_headers()))
+
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/graphql", subprotocols=["graphql-transport-ws"]) as websocket:
+            websocket.send_json({"type": "connection_init", "payload": {}})
+            assert websocket.receive_json()["type"] == "connection_ack"
+            websocket.send_json({
+                "id": "1",
+                "type": "subscribe",
+                # The fragment keeps this on the regular (resolver) path.
+                "payload": {
+                    "query": (
+                        "subscription { prices { ...P } } "
+                        "fragment P on Price { symbol price }"
+                    )
+                },
+            })
+            msg = websocket.receive_json()
+            assert msg["payload"]["data"]["prices"][0]["symbol"] == "AAPL"
+            websocket.send_json({"id": "1", "type": "complete"})
+
+    for stage in ("consume", "decode", "execute", "socket_write", "total"):
+        assert LATENCY.histograms[stage].count == 1
+
+
+@pytest.mark.asyncio
+async def test_latency_query_reports_recorded_stages():
+    LATENCY.reset()
+    LATENCY.record("consume", 2_000_000)
+    LATENCY.record("total", 9_000_000)
+
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        query = "query { latency { stage count p99Ms maxMs } }"
+        resp = await client.post("/graphql", json={"query": query})
+
+    rows = resp.json()["data"]["latency"]
+    assert [r["stage"] for r in rows] == ["consume", "total"]
+    assert rows[0]["count"] == 1
+    assert rows[1]["maxMs"] == 9.0
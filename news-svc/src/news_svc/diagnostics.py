@@ -0,0 +1,230 @@
+"""
+Event-loop diagnostics for news-svc.
+
+The news feed generators, Kafka publishes and WebSocket writers all share
+one asyncio loop, so a single slow callback stalls everything. This module makes those
+stalls visible without redeploying.
+
+Components
+- LoopLagMonitor: a probe task sleeps for a fixed interval and records how
+  late it wakes up (scheduling delay) into a histogram. A watchdog thread
+  notices when the probe stops reporting and logs the loop thread's current
+  stack, i.e., the callback that is blocking.
+- profile_loop: a time-boxed in-process sampling profiler that periodically
+  captures the loop thread's stack from a worker thread and returns a
+  collapsed-stack file (one `frame;frame;frame count` line per unique stack)
+  suitable for flamegraph.pl / speedscope.
+- create_admin_router: `/admin/loop-lag` (JSON histogram) and
+  `/admin/profile?seconds=&interval_ms=` (collapsed-stack download).
+
+Environment variables
+- LOOP_LAG_INTERVAL_SECONDS: probe interval (default: 0.1)
+- SLOW_CALLBACK_SECONDS: stall duration that triggers a stack log (default: 0.1)
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+
+LOOP_LAG_INTERVAL: float = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+SLOW_CALLBACK_THRESHOLD: float = float(os.getenv("SLOW_CALLBACK_SECONDS", "0.1"))
+PROFILE_MAX_SECONDS: float = 60.0
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in microseconds: 1us .. ~67s on a log2 scale.
+_BUCKET_BOUNDS_US: list[int] = [1 << i for i in range(27)]
+
+
+class LagHistogram:
+    """Log2-bucket histogram of scheduling delays in microseconds."""
+
+    __slots__ = ("counts", "count", "max_us")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * (len(_BUCKET_BOUNDS_US) + 1)
+        self.count = 0
+        self.max_us = 0
+
+    def record(self, delay_us: int) -> None:
+        delay_us = max(0, delay_us)
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS_US, delay_us)] += 1
+        self.count += 1
+        if delay_us > self.max_us:
+            self.max_us = delay_us
+
+    def percentile(self, q: float) -> int:
+        """Return the bucket upper bound (us) at quantile `q` in [0, 1]."""
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                if i < len(_BUCKET_BOUNDS_US):
+                    return min(_BUCKET_BOUNDS_US[i], self.max_us)
+                return self.max_us
+        return self.max_us
+
+
+class LoopLagMonitor:
+    """Measure event-loop scheduling delay and log stacks of stalls."""
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        slow_threshold: float = SLOW_CALLBACK_THRESHOLD,
+    ) -> None:
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.histogram = LagHistogram()
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the probe task on the running loop and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.histogram.record(int((now - expected) * 1_000_000))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported_for: Optional[float] = None
+        poll = max(0.005, self.slow_threshold / 4)
+        while not self._stop.wait(poll):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.slow_threshold or reported_for == beat:
+                continue
+            # Report each stall once, while it is still in progress.
+            reported_for = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id or -1)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+            logger.warning(
+                "Event loop blocked for %.0f ms; loop thread stack:\n%s",
+                stalled * 1000,
+                stack,
+            )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def snapshot(self) -> dict:
+        hist = self.histogram
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": hist.count,
+            "stalls": self.stalls,
+            "p50_ms": hist.percentile(0.5) / 1000,
+            "p90_ms": hist.percentile(0.9) / 1000,
+            "p99_ms": hist.percentile(0.99) / 1000,
+            "max_ms": hist.max_us / 1000,
+        }
+
+
+LOOP_MONITOR = LoopLagMonitor()
+
+
+def _collapse(frame) -> str:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def sample_stacks(thread_id: int, seconds: float, interval: float) -> Counter:
+    """Sample `thread_id`'s stack every `interval` seconds for `seconds`."""
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            counts[_collapse(frame)] += 1
+        del frame
+        time.sleep(interval)
+    return counts
+
+
+def render_collapsed(counts: Counter) -> str:
+    """Render sampled stacks in collapsed-stack (flamegraph) format."""
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+
+async def profile_loop(seconds: float, interval: float) -> str:
+    """Profile the calling event loop's thread without blocking it."""
+    thread_id = threading.get_ident()
+    counts = await asyncio.to_thread(sample_stacks, thread_id, seconds, interval)
+    return render_collapsed(counts)
+
+
+def create_admin_router(monitor: LoopLagMonitor = LOOP_MONITOR) -> APIRouter:
+    """Build the `/admin` routes exposing loop lag and the sampling profiler."""
+    router = APIRouter(prefix="/admin")
+    profiling = asyncio.Lock()
+
+    @router.get("/loop-lag")
+    async def loop_lag() -> dict:
+        return monitor.snapshot()
+
+    @router.get("/profile", response_class=PlainTextResponse)
+    async def profile(
+        seconds: float = Query(5.0, gt=0, le=PROFILE_MAX_SECONDS),
+        interval_ms: float = Query(5.0, ge=1, le=1000),
+    ) -> PlainTextResponse:
+        if profiling.locked():
+            raise HTTPException(status_code=409, detail="A profile is already running")
+        async with profiling:
+            text = await profile_loop(seconds, interval_ms / 1000)
+        return PlainTextResponse(
+            text,
+            headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+        )
+
+    return router
@@ -1,5 +1,7 @@
 import os
 import json
+import time
+import uuid
 import logging
 from typing import Optional, Iterable
 
@@ -44,6 +46,37 @@ async def publish_batch(topic: str, values: Iterable[bytes]) -> None:
         logging.warning("Kafka publish failed: %s", exc)
 
 
+async def publish_traced(topic: str, items: Iterable[tuple[bytes, list[tuple[str, bytes]]]]) -> None:
+    """Publish (payload, headers) pairs; same failure semantics as publish_batch."""
+    producer = await ensure_producer()
+    if producer is None:
+        return
+    try:
+        for value, headers in items:
+            await producer.send_and_wait(topic, value, headers=headers)
+    except Exception as exc:  # pragma: no cover
+        logging.warning("Kafka publish failed: %s", exc)
+
+
+def trace_headers(stamps: dict[str, int]) -> list[tuple[str, bytes]]:
+    """Build tracing headers: a fresh `trace-id` plus `ts-<stage>` stamps.
+
+    Stamps are wall-clock nanoseconds (`time.time_ns()`); the layout matches
+    data-svc's tracing headers so both topics can be analysed the same way.
+    """
+    headers = [("trace-id", uuid.uuid4().hex.encode("ascii"))]
+    for stage, ns in stamps.items():
+        headers.append(("ts-" + stage, str(ns).encode("ascii")))
+    return headers
+
+
+def encode_traced_news_item(item: object, origin_ns: int, generated_ns: int) -> tuple[bytes, list[tuple[str, bytes]]]:
+    """Encode a news item together with its origin/generate/encode trace headers."""
+    value = encode_news_item(item)
+    stamps = {"origin": origin_ns, "generate": generated_ns, "encode": time.time_ns()}
+    return value, trace_headers(stamps)
+
+
 def encode_news_item(item: object) -> bytes:
     payload = {
         "id": getattr(item, "id", None),
@@ -1,12 +1,15 @@
 import asyncio
 import random
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import AsyncGenerator, List
 
 import strawberry
 from fastapi import FastAPI
 from strawberry.fastapi import GraphQLRouter
-from .kafka_utils import KAFKA_ENABLED, KAFKA_NEWS_TOPIC, encode_news_item, publish_batch
+from .diagnostics import LOOP_MONITOR, create_admin_router
+from .kafka_utils import KAFKA_ENABLED, KAFKA_NEWS_TOPIC, encode_traced_news_item, publish_traced
 
 
 
@@ -58,11 +61,16 @@ class Subscription:
         # Slightly slow down overall cadence while preserving jitter characteristics
         SLOW_FACTOR = 1.3
         while True:
+            origin_ns = time.time_ns()
             batch = _random_news_batch(batch_size)
 
             if KAFKA_ENABLED:
+                generated_ns = time.time_ns()
                 asyncio.create_task(
-                    publish_batch(KAFKA_NEWS_TOPIC, (encode_news_item(n) for n in batch))
+                    publish_traced(
+                        KAFKA_NEWS_TOPIC,
+                        [encode_traced_news_item(n, origin_ns, generated_ns) for n in batch],
+                    )
                 )
 
             yield batch
@@ -74,9 +82,20 @@ class Subscription:
 
 schema = strawberry.Schema(query=Query, subscription=Subscription)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Event-loop lag monitor backing /admin/loop-lag
+    LOOP_MONITOR.start()
+    try:
+        yield
+    finally:
+        await LOOP_MONITOR.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 graphql_app = GraphQLRouter(schema)
 app.include_router(graphql_app, prefix="/graphql")
+app.include_router(create_admin_router())
 
 
 if __name__ == "__main__":
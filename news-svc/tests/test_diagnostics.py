@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from starlette.testclient import TestClient
+
+from news_svc.diagnostics import LOOP_MONITOR, LoopLagMonitor, create_admin_router
+from news_svc.server import app
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag_and_logs_blocking_stack(caplog):
+    monitor = LoopLagMonitor(interval=0.01, slow_threshold=0.05)
+    with caplog.at_level(logging.WARNING, logger="news_svc.diagnostics"):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # block the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] > 0
+    assert snapshot["max_ms"] >= 100
+    assert monitor.stalls == 1
+    assert "test_monitor_records_lag_and_logs_blocking_stack" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_profile_route_serves_collapsed_stacks_one_at_a_time():
+    admin = FastAPI()
+    admin.include_router(create_admin_router(LoopLagMonitor()))
+    transport = ASGITransport(app=admin)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        running = asyncio.create_task(client.get("/admin/profile", params={"seconds": 0.2, "interval_ms": 5}))
+        await asyncio.sleep(0.05)
+        busy = await client.get("/admin/profile", params={"seconds": 0.05})
+        resp = await running
+
+        too_long = await client.get("/admin/profile", params={"seconds": 600})
+        too_fine = await client.get("/admin/profile", params={"interval_ms": 0.1})
+
+    assert busy.status_code == 409
+    assert resp.status_code == 200
+    assert "profile.collapsed" in resp.headers["content-disposition"]
+    stack, count = resp.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) >= 1
+    assert too_long.status_code == 422
+    assert too_fine.status_code == 422
+
+
+def test_lifespan_starts_loop_monitor_and_mounts_admin_routes():
+    with TestClient(app) as client:
+        assert LOOP_MONITOR.running
+        lag = client.get("/admin/loop-lag")
+    assert not LOOP_MONITOR.running
+    assert lag.status_code == 200
+    assert {"samples", "p99_ms", "max_ms", "stalls"} <= lag.json().keys()
@@ -0,0 +1,58 @@
+"""
+Async Kafka utilities for position-svc.
+
+position-svc only consumes: it follows the `prices` topic published by
+data-svc to keep a local latest-price table for valuing positions.
+
+Environment variables
+- ENABLE_KAFKA: enable/disable Kafka usage (default: false)
+- KAFKA_BOOTSTRAP_SERVERS: Kafka bootstrap servers (default: "kafka:9092")
+- KAFKA_PRICE_TOPIC: topic name for price events (default: "prices")
+"""
+
+import os
+import json
+
+
+KAFKA_ENABLED: bool = os.getenv("ENABLE_KAFKA", "false").lower() in {"1", "true", "yes"}
+KAFKA_BOOTSTRAP: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
+KAFKA_PRICE_TOPIC: str = os.getenv("KAFKA_PRICE_TOPIC", "prices")
+
+
+try:
+    from aiokafka import AIOKafkaConsumer  # type: ignore
+except Exception:  # pragma: no cover
+    AIOKafkaConsumer = None  # type: ignore
+
+
+def decode_price(value: bytes) -> dict:
+    """Decode a data-svc JSON price payload (snake_case keys) into a dict."""
+    try:
+        obj = json.loads(value.decode("utf-8"))
+    except Exception:
+        return {}
+    return {
+        "symbol": obj.get("symbol"),
+        "price": obj.get("price"),
+        "change_percent": obj.get("change_percent"),
+        "timestamp": obj.get("timestamp"),
+    }
+
+
+async def create_started_consumer(topic: str, group_id: str | None = None):
+    """Create and start a consumer subscribed to topic or return None if disabled.
+
+    Uses latest offsets by default; call stop() on the returned consumer when
+    finished.
+    """
+    if not KAFKA_ENABLED or not KAFKA_BOOTSTRAP or AIOKafkaConsumer is None:
+        return None
+    consumer = AIOKafkaConsumer(
+        topic,
+        bootstrap_servers=KAFKA_BOOTSTRAP,
+        group_id=group_id,
+        auto_offset_reset="latest",
+        enable_auto_commit=True,
+    )
+    await consumer.start()
+    return consumer
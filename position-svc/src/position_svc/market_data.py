@@ -0,0 +1,104 @@
+"""
+Latest-price table for position valuation.
+
+A background task follows the `prices` topic and keeps only the most recent
+price per symbol. Resolvers never read the table directly; they go through a
+per-request DataLoader (`create_price_loader`) so every symbol in a response
+is looked up in a single batch, however many positions reference it.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Iterable, Optional
+
+from strawberry.dataloader import DataLoader
+
+from .kafka_utils import KAFKA_PRICE_TOPIC, create_started_consumer, decode_price
+
+
+# Reconnect backoff for the prices consumer (doubles up to the max).
+RECONNECT_INITIAL_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+
+
+class PriceTable:
+    """Symbol -> latest traded price."""
+
+    def __init__(self) -> None:
+        self._prices: dict[str, float] = {}
+
+    def update(self, symbol: str, price: float) -> None:
+        self._prices[symbol] = price
+
+    def get_many(self, symbols: Iterable[str]) -> list[Optional[float]]:
+        prices = self._prices
+        return [prices.get(s) for s in symbols]
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+
+LATEST_PRICES = PriceTable()
+
+
+def create_price_loader(table: Optional[PriceTable] = None) -> DataLoader[str, Optional[float]]:
+    """Build a request-scoped loader batching symbol lookups against `table`.
+
+    Defaults to the process-wide LATEST_PRICES table.
+    """
+    if table is None:
+        table = LATEST_PRICES
+
+    async def load(symbols: list[str]) -> list[Optional[float]]:
+        return table.get_many(symbols)
+
+    return DataLoader(load_fn=load)
+
+
+async def price_consumer_loop(
+    table: Optional[PriceTable] = None,
+    initial_backoff: float = RECONNECT_INITIAL_SECONDS,
+    max_backoff: float = RECONNECT_MAX_SECONDS,
+) -> None:
+    """Apply every message on the prices topic to `table` until cancelled.
+
+    The broker may be unreachable at startup or drop later, so a failed
+    start or read is logged and retried with exponential backoff (reset
+    after every successful start). Records that do not parse are skipped.
+    """
+    if table is None:
+        table = LATEST_PRICES
+    backoff = initial_backoff
+    while True:
+        consumer = None
+        try:
+            consumer = await create_started_consumer(KAFKA_PRICE_TOPIC, group_id=None)
+            if consumer is None:
+                logging.warning("Kafka not available: live prices disabled for positions")
+                return
+            backoff = initial_backoff
+            while True:
+                message = await consumer.getone()
+                _apply_record(table, message.value)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logging.warning("Price consumer failed, retrying in %.1fs: %s", backoff, exc)
+        finally:
+            if consumer is not None:
+                with suppress(Exception):
+                    await consumer.stop()
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
+
+def _apply_record(table: PriceTable, value: bytes) -> None:
+    data = decode_price(value)
+    symbol, price = data.get("symbol"), data.get("price")
+    if symbol is None or price is None:
+        return
+    try:
+        table.update(str(symbol), float(price))
+    except (TypeError, ValueError):
+        logging.debug("Skipping malformed price record: %r", value)
@@ -1,7 +1,16 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
 import strawberry
 from strawberry.fastapi import GraphQLRouter
+from strawberry.types import Info
 from fastapi import FastAPI
 
+from .diagnostics import LOOP_MONITOR, create_admin_router
+from .kafka_utils import KAFKA_ENABLED
+from .market_data import create_price_loader, price_consumer_loop
+
 # database
 postions = [
     {
@@ -9,7 +18,7 @@ postions = [
         "symbol": "AAPL",
         "quantity": 100,
         "price": 150.00
-    },  
+    },
     {
         "id": 2,
         "symbol": "GOOG",
@@ -25,6 +34,23 @@ class Position:
     quantity: int
     price: float
 
+    @strawberry.field
+    async def last_price(self, info: Info) -> Optional[float]:
+        """Latest market price for the symbol, or null before the first tick."""
+        return await info.context["price_loader"].load(self.symbol)
+
+    @strawberry.field
+    async def market_value(self, info: Info) -> Optional[float]:
+        """lastPrice * quantity, or null before the first tick."""
+        last = await info.context["price_loader"].load(self.symbol)
+        return None if last is None else last * self.quantity
+
+    @strawberry.field
+    async def unrealized_pnl(self, info: Info) -> Optional[float]:
+        """(lastPrice - price) * quantity, or null before the first tick."""
+        last = await info.context["price_loader"].load(self.symbol)
+        return None if last is None else (last - self.price) * self.quantity
+
 @strawberry.type
 class Query:
     @strawberry.field
@@ -43,14 +69,41 @@ class Query:
 # Create the GraphQL schema
 schema = strawberry.Schema(query=Query)
 
+
+async def get_context() -> dict:
+    # A fresh loader per request so batching and caching never span requests
+    return {"price_loader": create_price_loader()}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Event-loop lag monitor backing /admin/loop-lag
+    LOOP_MONITOR.start()
+    # Follow the prices topic to keep the latest-price table current
+    consumer_task: Optional[asyncio.Task] = None
+    if KAFKA_ENABLED:
+        consumer_task = asyncio.create_task(price_consumer_loop())
+    try:
+        yield
+    finally:
+        if consumer_task is not None:
+            consumer_task.cancel()
+            try:
+                await consumer_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await LOOP_MONITOR.stop()
+
+
 # Create FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add GraphQL route
-graphql_app = GraphQLRouter(schema)
+graphql_app = GraphQLRouter(schema, context_getter=get_context)
 app.include_router(graphql_app, prefix="/graphql")
+app.include_router(create_admin_router())
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=4000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=4000)
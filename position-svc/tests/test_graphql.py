@@ -1,6 +1,11 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 
+from position_svc import market_data
 from position_svc.server import app
 
 
@@ -40,3 +45,80 @@ async def test_positions_query_contains_expected_items():
         # Assert known fixtures exist
         assert any(p["symbol"] == "AAPL" and p["id"] == 1 for p in positions)
         assert any(p["symbol"] == "GOOG" and p["id"] == 2 for p in positions)
+
+
+@pytest.mark.asyncio
+async def test_positions_valued_against_latest_prices_in_one_batch(monkeypatch):
+    table = market_data.PriceTable()
+    table.update("AAPL", 160.0)
+    calls = []
+    original = table.get_many
+
+    def get_many(symbols):
+        calls.append(list(symbols))
+        return original(symbols)
+
+    monkeypatch.setattr(table, "get_many", get_many)
+    monkeypatch.setattr(market_data, "LATEST_PRICES", table)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        query = """
+        query {
+          positions { symbol lastPrice marketValue unrealizedPnl }
+        }
+        """
+        resp = await client.post("/graphql", json={"query": query})
+        assert resp.status_code == 200
+        positions = {p["symbol"]: p for p in resp.json()["data"]["positions"]}
+
+    assert positions["AAPL"] == {
+        "symbol": "AAPL",
+        "lastPrice": 160.0,
+        "marketValue": 16000.0,
+        "unrealizedPnl": 1000.0,
+    }
+    # No tick seen yet for GOOG
+    assert positions["GOOG"]["lastPrice"] is None
+    assert positions["GOOG"]["marketValue"] is None
+    # Every symbol in the response was resolved in a single lookup
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["AAPL", "GOOG"]
+
+
+@pytest.mark.asyncio
+async def test_price_consumer_reconnects_and_skips_bad_records(monkeypatch):
+    table = market_data.PriceTable()
+    records = [
+        SimpleNamespace(value=json.dumps({"symbol": "AAPL", "price": "n/a"}).encode()),
+        SimpleNamespace(value=json.dumps({"symbol": "AAPL", "price": 161.5}).encode()),
+    ]
+    starts = []
+
+    class Consumer:
+        async def getone(self):
+            if records:
+                return records.pop(0)
+            await asyncio.sleep(3600)
+
+        async def stop(self):
+            pass
+
+    async def flaky_consumer(topic, group_id=None):
+        starts.append(topic)
+        if len(starts) == 1:
+            raise ConnectionError("broker not up yet")
+        return Consumer()
+
+    monkeypatch.setattr(market_data, "create_started_consumer", flaky_consumer)
+    task = asyncio.create_task(market_data.price_consumer_loop(table, initial_backoff=0.01))
+    for _ in range(100):
+        if table.get_many(["AAPL"]) == [161.5]:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(starts) == 2
+    assert table.get_many(["AAPL"]) == [161.5]